@@ -1,8 +1,282 @@
 import pandas as pd
 import streamlit as st
-import gspread
-from gspread_dataframe import get_as_dataframe, set_with_dataframe
-from oauth2client.service_account import ServiceAccountCredentials
-from datetime import datetime
+from datetime import datetime, timedelta
 
-# ... rest of the updated script is expected to be restored by user from version history
+import config
+from archive import archived_seasons, freeze_season, load_season
+from clinch import clinching
+from fixtures import schedule, write_fixtures
+from leagues import LeagueRegistry
+from scheduler import scheduler
+from sheet_cache import cache
+from sheet_ranges import read_results
+from simulate import cached_outlook
+from snapshots import position_race
+from standings import AWAY, HOME, VENUE, compute_standings, split_standings, split_table
+from tiebreakers import rank
+from timing import Profiler, rerun, stage, totals
+
+CURRENT_SEASON = "Current season"
+
+st.set_page_config(page_title="League Standings", layout="wide")
+
+
+@st.cache_resource
+def league_registry():
+    return LeagueRegistry(loader=read_results)
+
+
+@st.cache_resource
+def archived_table(league_key, season, tiebreak_rules):
+    results = load_season(season, league_key)
+    return results, rank(compute_standings(results), results, tiebreak_rules)
+
+
+def show_tables(results, table, violations=None):
+    with stage("render"):
+        if violations is not None and len(violations):
+            with st.expander(f"{len(violations)} problem(s) in the results sheet"):
+                st.dataframe(violations, hide_index=True, use_container_width=True)
+
+        st.subheader("Table")
+        st.dataframe(table, hide_index=True, use_container_width=True)
+        if "Status" in table:
+            st.caption(
+                "Best/Worst: positions still possible on points. "
+                f"C champions, Q top {config.QUALIFY_PLACES} secured, R relegated."
+            )
+
+        st.subheader("Results")
+        st.dataframe(results, hide_index=True, use_container_width=True)
+
+
+def show_position_race(race):
+    import altair as alt
+
+    chart = alt.Chart(race).mark_line(point=True).encode(
+        x=alt.X("Round:O"),
+        y=alt.Y("Position:Q", scale=alt.Scale(reverse=True, domain=[1, int(race["Position"].max())])),
+        color=alt.Color("Team:N"),
+        tooltip=["Team", "Round", "Position", "Pts", "GD"],
+    )
+    st.altair_chart(chart, use_container_width=True)
+
+
+@st.fragment(run_every=config.POLL_INTERVAL)
+def live_division(league_key, division):
+    # Looked up on every run: the fragment outlives an eviction of the league's state.
+    state = league_registry().get(league_key)
+    generation, (results, violations) = state.poller.value(division)
+    key = f"table_{state.league.key}_{division}"
+    version = (state.epoch, generation)
+    shown = st.session_state.get(key)
+    if shown is None or shown[0] != version:
+        with stage("standings", league=state.league.key, division=division):
+            table = rank(state.engines[division].update(results), results, state.league.tiebreak_rules)
+            table = clinching(table, results, legs=state.league.legs)
+            table["Elo"] = table["Team"].map(state.ratings[division].update(results)).round()
+            form = state.form[division].update(results, generation)
+            table = table.join(form[["Form", "Streak"]], on="Team")
+            splits = split_standings(results, halves=True, rules=state.league.tiebreak_rules, legs=state.league.legs)
+            state.snapshots[division].update(results)
+            race = position_race(results)
+        st.session_state[key] = shown = (version, table, race, form, splits)
+    _, table, race, form, splits = shown
+
+    snapshots = state.snapshots[division]
+    if snapshots.rounds:
+        as_of = st.select_slider(
+            "Table after round", options=snapshots.rounds + ["Latest"], value="Latest",
+            key=f"round_{state.league.key}_{division}",
+        )
+        if as_of != "Latest":
+            table = snapshots.table_at(as_of, results, state.league.tiebreak_rules)
+    show_tables(results, table, violations)
+
+    if not race.empty:
+        with st.expander("Position race"):
+            show_position_race(race)
+
+    if not form.empty:
+        with st.expander("Form and streaks"):
+            st.dataframe(form.reset_index(), hide_index=True, use_container_width=True)
+
+    with st.expander("Home and away tables"):
+        halves = st.toggle("First and second half instead", key=f"halves_{state.league.key}_{division}")
+        names = ["First Half", "Second Half"] if halves else ["Overall", "Home", "Away"]
+        for column, name in zip(st.columns(len(names)), names):
+            column.caption(name)
+            column.dataframe(
+                split_table(splits, name).reset_index()[["Pos", "Team", "P", "GD", "Pts"]], hide_index=True,
+                use_container_width=True,
+            )
+
+    if st.toggle("Season outlook", key=f"outlook_{state.league.key}_{division}"):
+        with stage("simulate", league=state.league.key, division=division):
+            odds = cached_outlook(results, rules=state.league.tiebreak_rules, legs=state.league.legs)
+        st.caption(f"Remaining fixtures simulated {config.SIMULATIONS:,} times from the scoring so far.")
+        st.dataframe(odds, hide_index=True, use_container_width=True)
+
+
+def edit_results(state, division, results):
+    with st.expander("Edit results"):
+        editable = results.astype({column: "string" for column in results.select_dtypes("category")})
+        key = f"{state.league.key}_{division}"
+        edited = st.data_editor(editable, num_rows="dynamic", use_container_width=True, key=f"editor_{key}")
+        if st.button("Save results", key=f"save_{key}"):
+            try:
+                state.submit(division, edited)
+            except Exception as error:
+                st.error(f"Saving failed: {error}")
+            else:
+                st.success("Changes queued for the sheet.")
+        error = state.write_error(division)
+        if error is not None:
+            st.warning(f"Queued edits have not reached the sheet yet: {error}")
+        if hasattr(state.poller, "conflicts"):
+            conflicts = state.poller.conflicts(division)
+            if len(conflicts):
+                st.warning(f"{len(conflicts)} edit(s) were overridden by newer changes made in the sheet.")
+                st.dataframe(conflicts, hide_index=True, use_container_width=True)
+
+
+def archive_season(state):
+    divisions = state.league.divisions
+    with st.sidebar.expander("Archive season"):
+        name = st.text_input("Season name", value=str(datetime.now().year)).strip()
+        if st.button("Freeze season") and name:
+            try:
+                for division in divisions:
+                    results = state.poller.value(division)[1][0]
+                    freeze_season(name if len(divisions) == 1 else f"{name} {division}", results, state.league.key)
+            except ValueError as error:
+                st.error(str(error))
+            else:
+                st.success(f"Archived {name}.")
+
+
+def generate_fixtures(state):
+    with st.sidebar.expander("Generate fixtures"):
+        start = st.date_input("First matchday")
+        interval = st.number_input("Days between rounds", min_value=1, max_value=28, value=7)
+        double = st.checkbox("Home and away legs", value=state.league.legs == 2)
+        blackouts = st.text_area("Blackout dates", help="One date per line.")
+        unavailable = st.text_area("Unavailable grounds", help="One 'ground, date' per line.")
+        key = f"fixtures_{state.league.key}"
+        if st.button("Preview fixtures"):
+            closed = [
+                tuple(part.strip() for part in line.rsplit(",", 1)) for line in unavailable.splitlines() if "," in line
+            ]
+            preview = {}
+            try:
+                for division in state.league.divisions:
+                    results = state.poller.value(division)[1][0]
+                    teams = sorted(set(results[HOME].dropna().astype(str)) | set(results[AWAY].dropna().astype(str)))
+                    played_at = results.dropna(subset=[VENUE]).groupby(HOME, observed=True)[VENUE]
+                    grounds = played_at.agg(lambda venues: venues.mode().iat[0])
+                    preview[division] = schedule(
+                        teams, start, venues=grounds.astype(str).to_dict(), unavailable=closed,
+                        blackouts=[line.strip() for line in blackouts.splitlines() if line.strip()],
+                        interval=timedelta(days=int(interval)), double=double,
+                    )
+            except ValueError as error:
+                st.error(f"Could not build the fixtures: {error}")
+                return
+            st.session_state[key] = preview
+        preview = st.session_state.get(key)
+        if not preview:
+            return
+        for division, (fixtures, problems) in preview.items():
+            rounds = fixtures["Round"].max() if len(fixtures) else 0
+            st.caption(f"{division}: {len(fixtures)} matches over {rounds} rounds")
+            if len(problems):
+                st.warning(f"{len(problems)} match(es) at an unavailable ground.")
+                st.dataframe(problems, hide_index=True, use_container_width=True)
+        overwrite = st.checkbox(
+            "Overwrite this season's results with these fixtures",
+            help="Every results worksheet is replaced, scores included. Archive the season first to keep them.",
+        )
+        if overwrite and st.button("Write fixtures"):
+            if state.spreadsheet is None:
+                st.error("The spreadsheet is not reachable right now.")
+                return
+            current = {division: state.poller.value(division)[1][0] for division in preview}
+            fixtures = {division: fixtures for division, (fixtures, _) in preview.items()}
+            write_fixtures(state.spreadsheet, fixtures, current)
+            del st.session_state[key]
+            st.success("Fixtures written to the sheet.")
+
+
+def main(admin=False):
+    registry = league_registry()
+    leagues = registry.leagues
+    league_key = st.query_params.get("league", next(iter(leagues)))
+    if league_key not in leagues:
+        st.error(f"Unknown league {league_key!r}.")
+        st.stop()
+    if len(leagues) > 1:
+        keys = list(leagues)
+        chosen = st.sidebar.selectbox(
+            "League", keys, index=keys.index(league_key), format_func=lambda k: leagues[k].title
+        )
+        if chosen != league_key:
+            st.query_params["league"] = chosen
+            st.rerun()
+    league = leagues[league_key]
+
+    st.title(league.title)
+
+    season = st.sidebar.selectbox("Season", [CURRENT_SEASON] + archived_seasons(league.key))
+
+    if season == CURRENT_SEASON:
+        state = registry.get(league.key)
+        divisions = league.divisions
+        tabs = st.tabs(list(divisions)) if len(divisions) > 1 else [st.container()]
+        for division, tab in zip(divisions, tabs):
+            with tab:
+                live_division(league.key, division)
+                if admin:
+                    edit_results(state, division, state.poller.value(division)[1][0])
+
+        if admin:
+            archive_season(state)
+            generate_fixtures(state)
+    else:
+        results, table = archived_table(league.key, season, league.tiebreak_rules)
+        show_tables(results, table)
+
+    with st.sidebar.expander("Sheet cache"):
+        st.json(cache.stats())
+
+    with st.sidebar.expander("Sheets requests"):
+        st.json(scheduler.metrics())
+
+    with st.sidebar.expander("Leagues"):
+        st.json(registry.stats())
+
+    if season == CURRENT_SEASON and hasattr(state.poller, "status"):
+        with st.sidebar.expander("Local mirror"):
+            st.json(state.poller.status())
+
+
+def show_timings(timings, report=None):
+    with st.sidebar.expander("Timings"):
+        st.caption("This rerun (ms)")
+        rerun_ms = pd.DataFrame(timings, columns=["Stage", "ms"]).groupby("Stage", sort=False).sum() * 1000
+        st.dataframe(rerun_ms.round(1), use_container_width=True)
+        st.caption("Since the server started")
+        st.dataframe(pd.DataFrame.from_dict(totals(), orient="index"), use_container_width=True)
+    if report is not None:
+        with st.expander("Profile of this rerun"):
+            st.code(report)
+
+
+admin = bool(config.ADMIN_TOKEN) and st.query_params.get("admin") == config.ADMIN_TOKEN
+profiler = Profiler().start() if admin and "profile" in st.query_params else None
+try:
+    with rerun() as timings:
+        main(admin)
+finally:
+    report = profiler.stop() if profiler is not None else None
+if admin:
+    show_timings(timings, report)
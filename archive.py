@@ -0,0 +1,49 @@
+"""Local columnar archive for finished seasons.
+
+A finished season never changes, so it is frozen once into an uncompressed
+Feather file in the results schema and read back memory-mapped, without going
+through the Sheets API.
+"""
+from pathlib import Path
+
+import pyarrow.feather as feather
+
+import config
+from schema import coerce_results
+
+SUFFIX = ".feather"
+
+
+def _directory(league=None):
+    directory = Path(config.ARCHIVE_DIR)
+    return directory / league if league else directory
+
+
+def _path(season, league=None):
+    """Archive file of ``season``; the name must not reach outside the archive directory."""
+    if not season or season.strip(".") == "" or any(separator in season for separator in "/\\"):
+        raise ValueError(f"Invalid season name {season!r}")
+    return _directory(league) / f"{season}{SUFFIX}"
+
+
+def archived_seasons(league=None):
+    directory = _directory(league)
+    if not directory.is_dir():
+        return []
+    return sorted((path.stem for path in directory.glob(f"*{SUFFIX}")), reverse=True)
+
+
+def freeze_season(season, results, league=None):
+    """Write ``results`` for ``season`` to the archive and return the file path."""
+    path = _path(season, league)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    frame, _ = coerce_results(results)
+    frame.reset_index(drop=True).to_feather(path, compression="uncompressed")
+    return path
+
+
+def load_season(season, league=None):
+    path = _path(season, league)
+    if not path.exists():
+        raise FileNotFoundError(f"Season {season!r} has not been archived")
+    return feather.read_table(path, memory_map=True).to_pandas()
@@ -0,0 +1,94 @@
+"""Service-account credentials that share access tokens between processes.
+
+Every Streamlit worker on a host builds its own client, and each would
+otherwise sign a JWT and fetch an access token from Google at startup and
+again every hour. ``CachedServiceAccountCredentials`` keeps tokens in a
+small JSON file instead: a refresh first looks there and only goes to
+Google when no cached token has enough lifetime left, holding an exclusive
+file lock meanwhile so that a host scaling out fetches one token, not one
+per worker.
+"""
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from google.auth import _helpers
+from google.oauth2 import service_account
+
+import config
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, the cache still works per process.
+    fcntl = None
+
+# A cached token is only reused while it has at least this long to live.
+MIN_LIFETIME = timedelta(minutes=5)
+
+
+class TokenCache:
+    """``{key: (token, expiry)}`` in a JSON file readable only by its owner."""
+
+    def __init__(self, path=config.TOKEN_CACHE_FILE):
+        self.path = Path(path)
+
+    def load(self, key):
+        try:
+            entry = json.loads(self.path.read_text())[key]
+        except (OSError, ValueError, KeyError):
+            return None
+        return entry["token"], datetime.fromisoformat(entry["expiry"])
+
+    def store(self, key, token, expiry):
+        try:
+            entries = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            entries = {}
+        entries[key] = {"token": token, "expiry": expiry.isoformat()}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        with os.fdopen(handle, "w") as out:
+            json.dump(entries, out)
+        os.replace(temporary, self.path)
+
+    @contextmanager
+    def locked(self):
+        """Hold the cache's exclusive lock for a fetch-and-store."""
+        if fcntl is None:
+            yield
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_name(self.path.name + ".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class CachedServiceAccountCredentials(service_account.Credentials):
+    token_cache = TokenCache()
+
+    @property
+    def _cache_key(self):
+        return f"{self.service_account_email} {' '.join(sorted(self._scopes or ()))}"
+
+    def _adopt_cached(self):
+        cached = self.token_cache.load(self._cache_key)
+        if cached is None or cached[1] - _helpers.utcnow() < MIN_LIFETIME:
+            return False
+        self.token, self.expiry = cached
+        return True
+
+    def refresh(self, request):
+        if self._adopt_cached():
+            return
+        with self.token_cache.locked():
+            # Another worker may have fetched a token while we waited for the lock.
+            if self._adopt_cached():
+                return
+            super().refresh(request)
+            self.token_cache.store(self._cache_key, self.token, self.expiry)
@@ -0,0 +1,189 @@
+"""In-memory stand-in for the parts of the gspread API the app uses.
+
+Values are served the way the Sheets values API returns them: trailing empty
+rows and cells are trimmed, and ranges may be whole sheets, A1 rectangles or
+open-ended column ranges such as ``C2:C``. An optional per-request latency
+simulates the network round trip.
+"""
+import json
+import re
+import time
+from itertools import count
+
+import numpy as np
+
+from standings import AWAY, AWAY_GOALS, DATE, HOME, HOME_GOALS, ROUND, VENUE
+
+RESULTS_HEADER = [DATE, ROUND, HOME, AWAY, HOME_GOALS, AWAY_GOALS, VENUE]
+
+_A1 = re.compile(r"^([A-Z]*)(\d*)$")
+_ids = count(1)
+
+
+def _column_index(letters):
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index
+
+
+def _parse_bound(bound):
+    letters, digits = _A1.match(bound).groups()
+    return (int(digits) if digits else None), (_column_index(letters) if letters else None)
+
+
+def split_range(a1_range):
+    """``"'Results'!B2:C"`` -> ``("Results", (2, 2), (None, 3))`` as (row, col) bounds."""
+    if "!" in a1_range:
+        title, cells = a1_range.rsplit("!", 1)
+    else:
+        title, cells = a1_range, ""
+    title = title.strip("'").replace("''", "'")
+    if not cells:
+        return title, (None, None), (None, None)
+    first, _, last = cells.partition(":")
+    return title, _parse_bound(first), _parse_bound(last or first)
+
+
+def _trim(rows):
+    rows = [list(row) for row in rows]
+    for row in rows:
+        while row and row[-1] in ("", None):
+            row.pop()
+    while rows and not rows[-1]:
+        rows.pop()
+    return rows
+
+
+class _Response:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class FakeClient:
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+
+    def request(self, method, url, params=None, **kwargs):
+        self.spreadsheet._round_trip()
+        return _Response({"version": str(self.spreadsheet.version)})
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, values, row_count=None, col_count=None):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = next(_ids)
+        self.values = [list(row) for row in values]
+        self.row_count = row_count or len(self.values)
+        self.col_count = col_count or max((len(row) for row in self.values), default=0)
+
+    def add_rows(self, rows):
+        self.row_count += rows
+
+    def get_all_values(self):
+        self.spreadsheet._round_trip()
+        return [row + [""] * (self.col_count - len(row)) for row in self.values]
+
+
+class FakeSpreadsheet:
+    def __init__(self, title="League Standings", latency=0.0):
+        self.id = f"fake-{next(_ids)}"
+        self.title = title
+        self.latency = latency
+        self.version = 1
+        self.requests = 0
+        self.payload_bytes = 0
+        self.client = FakeClient(self)
+        self._worksheets = {}
+
+    def _round_trip(self):
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def add_worksheet(self, title, values, row_count=None, col_count=None):
+        worksheet = FakeWorksheet(self, title, values, row_count, col_count)
+        self._worksheets[title] = worksheet
+        return worksheet
+
+    def worksheet(self, title):
+        self._round_trip()
+        return self._worksheets[title]
+
+    def worksheets(self):
+        self._round_trip()
+        return list(self._worksheets.values())
+
+    def _values(self, a1_range, major_dimension="ROWS"):
+        title, (first_row, first_col), (last_row, last_col) = split_range(a1_range)
+        values = self._worksheets[title].values
+        first_row, first_col = (first_row or 1) - 1, (first_col or 1) - 1
+        rows = [row[first_col:last_col] for row in values[first_row:last_row]]
+        if major_dimension == "COLUMNS":
+            width = max((len(row) for row in rows), default=0)
+            rows = [[row[i] if i < len(row) else "" for row in rows] for i in range(width)]
+        return {"range": a1_range, "majorDimension": major_dimension, "values": _trim(rows)}
+
+    def _served(self, payload):
+        self.payload_bytes += len(json.dumps(payload, default=str))
+        return payload
+
+    def values_get(self, a1_range, params=None):
+        self._round_trip()
+        return self._served(self._values(a1_range, (params or {}).get("majorDimension", "ROWS")))
+
+    def values_batch_get(self, ranges, params=None):
+        self._round_trip()
+        major_dimension = (params or {}).get("majorDimension", "ROWS")
+        return self._served({"valueRanges": [self._values(a1_range, major_dimension) for a1_range in ranges]})
+
+    def values_batch_update(self, body=None):
+        self._round_trip()
+        for value_range in body["data"]:
+            title, (first_row, first_col), _ = split_range(value_range["range"])
+            values = self._worksheets[title].values
+            for i, row in enumerate(value_range["values"]):
+                r = first_row - 1 + i
+                while len(values) <= r:
+                    values.append([])
+                target = values[r]
+                for j, value in enumerate(row):
+                    c = first_col - 1 + j
+                    target.extend([""] * (c + 1 - len(target)))
+                    target[c] = value
+        self.version += 1
+        return {"totalUpdatedRanges": len(body["data"])}
+
+
+def generate_results(rows, teams=None, empty_rows=1000, seed=0):
+    """Header plus ``rows`` played matches, padded with ``empty_rows`` blank grid rows.
+
+    Like real league sheets, each row also carries a free-text notes column
+    the standings never read.
+    """
+    rng = np.random.default_rng(seed)
+    teams = teams or max(20, min(2000, int(np.sqrt(rows)) * 2))
+    names = np.array([f"Team {i:04d}" for i in range(teams)], dtype=object)
+    home = rng.integers(0, teams, rows)
+    away = (home + rng.integers(1, teams, rows)) % teams
+    home_goals = rng.poisson(1.5, rows)
+    away_goals = rng.poisson(1.1, rows)
+    rounds = np.arange(rows) // max(teams // 2, 1) + 1
+    dates = np.datetime64("2020-01-04") + (rounds - 1) * 7
+    values = [RESULTS_HEADER + ["Notes"]]
+    values.extend(
+        [str(d), int(r), names[h], names[a], int(hg), int(ag), f"{names[h]} Ground", f"Referee {h % 50:02d}, kick-off 15:00"]
+        for d, r, h, a, hg, ag in zip(dates, rounds, home, away, home_goals, away_goals)
+    )
+    return values, len(values) + empty_rows, len(values[0]) + 6
+
+
+def results_spreadsheet(rows, latency=0.0, **kwargs):
+    spreadsheet = FakeSpreadsheet(latency=latency)
+    values, row_count, col_count = generate_results(rows, **kwargs)
+    spreadsheet.add_worksheet("Results", values, row_count, col_count)
+    return spreadsheet
@@ -0,0 +1,157 @@
+"""Time each stage of read -> standings -> render against fake results sheets.
+
+    python -m bench.pipeline --sizes 1000 10000 100000 1000000 --output bench.json
+
+Every stage is repeated ``--repeat`` times and the min and median wall time
+are reported as JSON, one record per (rows, stage), together with the git
+revision so runs from different versions can be compared.
+"""
+import argparse
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import pandas as pd
+from gspread_dataframe import get_as_dataframe
+
+import scheduler
+from bench.fake_sheets import results_spreadsheet
+from schema import coerce_results
+from sheet_ranges import read_results
+from standings import StandingsEngine, compute_standings
+from tiebreakers import rank
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def _time(function, repeat):
+    timings = []
+    value = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = function()
+        timings.append(time.perf_counter() - start)
+    return value, timings
+
+
+def _render(frame):
+    # st.dataframe ships frames to the browser as Arrow IPC; this is the
+    # server-side share of rendering.
+    import pyarrow as pa
+
+    try:
+        table = pa.Table.from_pandas(frame)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed-type object columns; Streamlit falls back to strings too.
+        table = pa.Table.from_pandas(frame.astype(str))
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.tell()
+
+
+def _load_credentials():
+    from client import load_credentials
+
+    return load_credentials()
+
+
+def run(sizes, repeat=3, latency=0.0):
+    # The fake has no quota; pacing would only measure the token bucket.
+    unlimited = 10 ** 9
+    scheduler.scheduler = scheduler.RequestScheduler(unlimited, unlimited, unlimited)
+    records = []
+
+    def record(rows, stage, timings, **extra):
+        records.append({
+            "rows": rows,
+            "stage": stage,
+            "min_s": min(timings),
+            "median_s": statistics.median(timings),
+            "repeat": len(timings),
+            **extra,
+        })
+
+    try:
+        _, timings = _time(_load_credentials, repeat)
+        record(0, "credential_load", timings)
+    except Exception as error:  # missing key file or auth library
+        records.append({"rows": 0, "stage": "credential_load", "skipped": str(error)})
+
+    for rows in sizes:
+        spreadsheet = results_spreadsheet(rows, latency=latency)
+        worksheet = spreadsheet.worksheet("Results")
+
+        served = spreadsheet.payload_bytes
+        _, timings = _time(lambda: spreadsheet.values_get(worksheet.title), repeat)
+        record(rows, "sheet_fetch", timings, payload_bytes=(spreadsheet.payload_bytes - served) // repeat)
+
+        read_results(worksheet)  # discover and cache the header outside the timing
+        served = spreadsheet.payload_bytes
+        _, timings = _time(lambda: read_results(worksheet), repeat)
+        record(rows, "range_read", timings, payload_bytes=(spreadsheet.payload_bytes - served) // repeat)
+
+        raw, timings = _time(lambda: get_as_dataframe(worksheet), repeat)
+        record(rows, "get_as_dataframe", timings)
+
+        (results, violations), timings = _time(lambda: coerce_results(raw), repeat)
+        record(rows, "schema_coerce", timings, violations=len(violations))
+
+        table, timings = _time(lambda: compute_standings(results), repeat)
+        record(rows, "standings_full", timings, teams=len(table))
+
+        engine = StandingsEngine()
+        engine.update(results.iloc[:-1])
+        _, timings = _time(lambda: engine.update(results), 1)
+        record(rows, "standings_incremental", timings)
+
+        _, timings = _time(lambda: rank(table, results), repeat)
+        record(rows, "tiebreaks", timings)
+
+        _, timings = _time(lambda: _render(table), repeat)
+        record(rows, "render_table", timings)
+
+        size, timings = _time(lambda: _render(results), repeat)
+        record(rows, "render_results", timings, bytes=size)
+
+    return records
+
+
+def _revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated seconds per Sheets request")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = {
+        "revision": _revision(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "latency_s": args.latency,
+        "results": run(args.sizes, args.repeat, args.latency),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
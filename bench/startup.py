@@ -0,0 +1,124 @@
+"""Cold-start time of the app's first page, in fresh interpreters.
+
+    python -m bench.startup --repeat 5 --budget 2.5
+
+Each run starts a new Python process that imports everything app.py
+imports, then builds a league's live state from a warm local mirror and
+computes its table, which is what the first page needs before it can
+render. Reports min and median wall times as JSON, plus the heavy modules
+that are meant to load lazily but were imported anyway. Exits non-zero if
+any of them was, or if the median exceeds ``--budget`` seconds.
+"""
+import argparse
+import ast
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from bench.pipeline import _revision
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Needed only once Google is contacted or a chart is opened. (pyarrow is not
+# listed: pandas and every st.dataframe need it on the first page anyway.)
+LAZY_MODULES = ["gspread", "gspread_dataframe", "google.auth", "altair"]
+
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+{imports}
+imported = time.perf_counter()
+
+import logging
+logging.disable(logging.WARNING)
+from mirror import SheetMirror
+from standings import compute_standings
+from tiebreakers import rank
+
+def offline():
+    raise ConnectionError("no network during the startup benchmark")
+
+mirror = SheetMirror({path!r}, offline, ["Results"], interval=3600).start()
+_, (results, violations) = mirror.value("Results")
+table = rank(compute_standings(results), results)
+done = time.perf_counter()
+mirror.stop()
+json.dump({{
+    "import_s": imported - start,
+    "first_page_s": done - start,
+    "rows": len(results),
+    "loaded": [name for name in {lazy!r} if name in sys.modules],
+}}, sys.stdout)
+"""
+
+
+def app_imports(app=ROOT / "app.py"):
+    """Top-level import statements of ``app``, as source lines."""
+    tree = ast.parse(app.read_text())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def warm_mirror(path, rows):
+    """Fill a mirror file at ``path`` with ``rows`` fake results, as a previous process would have."""
+    import scheduler
+    from bench.fake_sheets import results_spreadsheet
+    from mirror import SheetMirror
+
+    unlimited = 10 ** 9
+    scheduler.scheduler = scheduler.RequestScheduler(unlimited, unlimited, unlimited)
+    spreadsheet = results_spreadsheet(rows)
+    SheetMirror(path, lambda: spreadsheet, ["Results"], interval=3600).sync_once()
+
+
+def run(rows=2_000, repeat=5):
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "startup.sqlite")
+        warm_mirror(path, rows)
+        child = _CHILD.format(imports="\n".join(app_imports()), path=path, lazy=LAZY_MODULES)
+        runs = []
+        for _ in range(repeat):
+            process = subprocess.run([sys.executable, "-c", child], cwd=ROOT, capture_output=True, text=True)
+            if process.returncode:
+                raise RuntimeError(f"Startup run failed:\n{process.stderr}")
+            runs.append(json.loads(process.stdout))
+    return {
+        "rows": rows,
+        "repeat": repeat,
+        "import_min_s": min(run["import_s"] for run in runs),
+        "import_median_s": statistics.median(run["import_s"] for run in runs),
+        "first_page_min_s": min(run["first_page_s"] for run in runs),
+        "first_page_median_s": statistics.median(run["first_page_s"] for run in runs),
+        "eagerly_loaded": sorted({name for run in runs for name in run["loaded"]}),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget", type=float, help="fail if the median first page takes longer (seconds)")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = {"revision": _revision(), "python": sys.version.split()[0], **run(args.rows, args.repeat)}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+
+    failures = []
+    if report["eagerly_loaded"]:
+        failures.append(f"imported at startup: {', '.join(report['eagerly_loaded'])}")
+    if args.budget is not None and report["first_page_median_s"] > args.budget:
+        failures.append(f"first page took {report['first_page_median_s']:.2f}s (budget {args.budget:.2f}s)")
+    if failures:
+        sys.exit("Startup regression: " + "; ".join(failures))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Process-wide gspread client.
+
+Streamlit re-executes app.py on every interaction, but imported modules stay
+in ``sys.modules``, so the client built here is created once per server
+process and shared by every session and every league. Its HTTP session
+keeps a connection pool large enough for all concurrent fetches.
+
+Credentials come from ``auth``: google-auth service-account credentials
+whose access tokens are shared through a file cache by every worker on the
+host. gspread and google-auth are imported when the client is first built,
+not with this module, so pages served from the local mirror start without
+them.
+"""
+import threading
+from datetime import timedelta
+
+import config
+import scheduler
+from timing import stage
+
+# Refresh a little before Google's one-hour expiry so in-flight requests
+# never go out with a token that dies on the way.
+REFRESH_MARGIN = timedelta(minutes=5)
+
+
+def load_credentials(credentials_file=config.CREDENTIALS_FILE, scopes=config.SCOPES):
+    with stage("credentials"):
+        from auth import CachedServiceAccountCredentials
+
+        return CachedServiceAccountCredentials.from_service_account_file(credentials_file, scopes=scopes)
+
+
+class SheetsClient:
+    def __init__(self, credentials_file=config.CREDENTIALS_FILE, scopes=config.SCOPES):
+        import gspread
+        from requests.adapters import HTTPAdapter
+
+        self._lock = threading.Lock()
+        self._credentials = load_credentials(credentials_file, scopes)
+        self._client = gspread.authorize(self._credentials)
+        pool = HTTPAdapter(pool_connections=config.HTTP_POOL_SIZE, pool_maxsize=config.HTTP_POOL_SIZE)
+        self._client.http_client.session.mount("https://", pool)
+        self._spreadsheets = {}
+
+    def _ensure_fresh(self):
+        from google.auth import _helpers
+
+        expiry = self._credentials.expiry
+        if not self._credentials.valid or expiry - _helpers.utcnow() < REFRESH_MARGIN:
+            with stage("token_refresh"):
+                from google.auth.transport.requests import Request
+
+                self._credentials.refresh(Request())
+
+    def open(self, name=config.SPREADSHEET_NAME):
+        """Return the spreadsheet called ``name``, opening it at most once."""
+        return self._open(("name", name), self._client.open, name)
+
+    def open_by_key(self, key):
+        return self._open(("key", key), self._client.open_by_key, key)
+
+    def _open(self, cache_key, opener, argument):
+        with self._lock:
+            self._ensure_fresh()
+            spreadsheet = self._spreadsheets.get(cache_key)
+            if spreadsheet is None:
+                with stage("open", spreadsheet=argument):
+                    spreadsheet = scheduler.read(opener, argument, key=("open",) + cache_key)
+                self._spreadsheets[cache_key] = spreadsheet
+            return spreadsheet
+
+    def forget(self, spreadsheet_id):
+        """Drop the handle of an evicted spreadsheet; it is reopened on next use."""
+        with self._lock:
+            for cache_key, spreadsheet in list(self._spreadsheets.items()):
+                if spreadsheet.id == spreadsheet_id:
+                    del self._spreadsheets[cache_key]
+
+
+_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_client():
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = SheetsClient()
+    return _instance
+
+
+def open_spreadsheet(name=config.SPREADSHEET_NAME):
+    return get_client().open(name)
@@ -0,0 +1,157 @@
+"""Guaranteed finishing positions ("clinched", "eliminated") from the table so far.
+
+Enumerating the outcomes of the remaining fixtures is exponential, so each
+team gets two bounds from small flow problems instead:
+
+``Best`` is a position the team cannot beat. It wins all its games; teams
+already past that total are above it whatever happens, and a max flow
+decides whether the other games can be shared out without anyone else
+passing it. Each game is relaxed to hand out ``min(win, 2 * draw)`` points
+in any split, which never gives a team more than a real result would, so a
+relaxed problem that has no room means the real one has none either.
+
+``Worst`` is a position the team cannot drop below. It loses all its games;
+a rival that cannot reach its total even by winning everything is beaten
+outright (an exact pairwise check), and a second flow, with each game
+handing out up to ``max(win, 2 * draw)`` points, bounds how many of the
+remaining rivals can get there together.
+
+Both flows only involve the teams, so each is a max flow on an
+``(n + 2)``-node graph and the whole table is settled in milliseconds.
+Level points count against the team: tiebreakers can still change until the
+last match, so a position is only claimed once it holds on points alone.
+"""
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+import config
+from standings import AWAY, HOME, LEGS, POINTS_FOR_DRAW, POINTS_FOR_WIN, remaining_fixtures, teams
+
+
+def _max_flow(capacity, source, sink):
+    """Edmonds-Karp on a dense capacity matrix (lists of ints), modified in place."""
+    nodes = len(capacity)
+    flow = 0
+    while True:
+        parent = [-1] * nodes
+        parent[source] = source
+        queue = deque([source])
+        while queue and parent[sink] < 0:
+            node = queue.popleft()
+            for other, room in enumerate(capacity[node]):
+                if room > 0 and parent[other] < 0:
+                    parent[other] = node
+                    queue.append(other)
+        if parent[sink] < 0:
+            return flow
+        bottleneck, node = None, sink
+        while node != source:
+            room = capacity[parent[node]][node]
+            bottleneck = room if bottleneck is None else min(bottleneck, room)
+            node = parent[node]
+        node = sink
+        while node != source:
+            capacity[parent[node]][node] -= bottleneck
+            capacity[node][parent[node]] += bottleneck
+            node = parent[node]
+        flow += bottleneck
+
+
+def _shortfall(pair_points, caps):
+    """Points of ``pair_points`` that cannot be shared out without a team passing its cap.
+
+    ``pair_points[u, v]`` is what the games between ``u`` and ``v`` hand out
+    in total, in any split. Every pair's points start with its lower-indexed
+    team; the flow then moves what it can from teams over their cap to teams
+    under it, through the games they share.
+    """
+    n = len(caps)
+    upper = np.triu(pair_points, 1)
+    load = upper.sum(axis=1)
+    excess = np.maximum(load - caps, 0)
+    if not excess.any():
+        return 0
+    source, sink = n, n + 1
+    capacity = np.zeros((n + 2, n + 2), dtype=np.int64)
+    capacity[:n, :n] = upper
+    capacity[source, :n] = excess
+    capacity[:n, sink] = np.maximum(caps - load, 0)
+    return int(excess.sum()) - _max_flow(capacity.tolist(), source, sink)
+
+
+def _fewest_to_cover(amounts, shortfall):
+    """Smallest number of ``amounts`` that can add up to ``shortfall``."""
+    if shortfall <= 0:
+        return 0
+    covered = np.cumsum(np.sort(amounts)[::-1])
+    return int(np.searchsorted(covered, shortfall)) + 1
+
+
+def position_bounds(table, results, win=POINTS_FOR_WIN, draw=POINTS_FOR_DRAW, legs=LEGS):
+    """``Best`` and ``Worst`` guaranteed positions per team, indexed by team name.
+
+    The games left are those of ``standings.remaining_fixtures`` for a
+    ``legs``-fold round-robin.
+    """
+    names = sorted(teams(results))
+    n = len(names)
+    index = pd.Index(names)
+    points = table.set_index("Team")["Pts"].reindex(names, fill_value=0).to_numpy(dtype=np.int64)
+    remaining = remaining_fixtures(results, legs)
+    games = np.zeros((n, n), dtype=np.int64)
+    np.add.at(games, (index.get_indexer(remaining[HOME]), index.get_indexer(remaining[AWAY])), 1)
+    games += games.T
+
+    if not games.any():
+        # Every meeting of the round-robin is played (or every listed
+        # fixture, for sheets that list them): the table, tiebreakers
+        # included, is final.
+        position = table.set_index("Team")["Pos"].reindex(names)
+        return pd.DataFrame({"Best": position, "Worst": position}).rename_axis("Team")
+
+    low, high = min(win, 2 * draw), max(win, 2 * draw)
+    best = np.empty(n, dtype=np.int64)
+    worst = np.empty(n, dtype=np.int64)
+    for team in range(n):
+        others = np.arange(n) != team
+        against = games[team]
+        rest = games * others[:, None] * others[None, :]
+        per_team = rest.sum(axis=1)
+
+        # Best case: the team wins every game it has left.
+        most = points[team] + win * against.sum()
+        above = others & (points > most)
+        caps = np.where(above | ~others, low * per_team, np.minimum(most - points, low * per_team))
+        room = low * per_team - caps
+        best[team] = 1 + above.sum() + _fewest_to_cover(room[others & ~above], _shortfall(low * rest, caps))
+
+        # Worst case: it loses them all, and each rival takes those points.
+        least = points[team]
+        start = points + win * against
+        threat = others & (start + high * per_team >= least)
+        needs = np.where(threat, np.maximum(least - start, 0), 0)
+        delivered = high * rest.sum() // 2 - _shortfall(high * rest, needs)
+        worst[team] = 1 + threat.sum() - _fewest_to_cover(needs[threat], needs.sum() - delivered)
+
+    return pd.DataFrame({"Best": best, "Worst": worst}, index=pd.Index(names, name="Team"))
+
+
+def clinching(table, results, win=POINTS_FOR_WIN, draw=POINTS_FOR_DRAW, qualify=config.QUALIFY_PLACES,
+              relegate=config.RELEGATION_PLACES, legs=LEGS):
+    """``table`` with each team's ``Best`` and ``Worst`` possible position and a ``Status`` mark.
+
+    Status is ``C`` once the title is clinched, ``Q`` once a top-``qualify``
+    place is, and ``R`` once relegation is certain.
+    """
+    bounds = position_bounds(table, results, win, draw, legs)
+    frame = table.join(bounds, on="Team")
+    n = len(frame)
+    status = np.select(
+        [frame["Worst"] == 1, frame["Worst"] <= qualify, frame["Best"] > n - relegate],
+        ["C", "Q", "R"],
+        "",
+    )
+    frame["Status"] = status
+    return frame
@@ -0,0 +1,90 @@
+import os
+import tempfile
+
+CREDENTIALS_FILE = os.environ.get("LEAGUE_CREDENTIALS_FILE", "league-standings-credentials.json")
+SCOPES = [
+    "https://spreadsheets.google.com/feeds",
+    "https://www.googleapis.com/auth/drive",
+]
+
+# Access tokens shared by every worker on the host (see auth.py).
+TOKEN_CACHE_FILE = os.environ.get(
+    "LEAGUE_TOKEN_CACHE_FILE", os.path.join(tempfile.gettempdir(), "league-standings", "token.json")
+)
+
+SPREADSHEET_NAME = os.environ.get("LEAGUE_SPREADSHEET", "League Standings")
+# Optional JSON file describing several leagues served from this process;
+# without it the single league above is served under DEFAULT_LEAGUE.
+LEAGUES_FILE = os.environ.get("LEAGUE_LEAGUES_FILE", "leagues.json")
+DEFAULT_LEAGUE = os.environ.get("LEAGUE_DEFAULT", "main")
+RESULTS_WORKSHEET = "Results"
+# One results worksheet per division; a single-division league just uses "Results".
+DIVISION_WORKSHEETS = [
+    title.strip() for title in os.environ.get("LEAGUE_DIVISIONS", RESULTS_WORKSHEET).split(",") if title.strip()
+]
+
+# Sheet reads are served from cache for up to SHEET_CACHE_TTL seconds unless
+# the spreadsheet's revision changes; the revision itself is rechecked at most
+# once per REVISION_CHECK_INTERVAL seconds.
+SHEET_CACHE_TTL = float(os.environ.get("LEAGUE_SHEET_CACHE_TTL", "60"))
+REVISION_CHECK_INTERVAL = float(os.environ.get("LEAGUE_REVISION_CHECK_INTERVAL", "5"))
+
+# Name of a tiebreaker chain in tiebreakers.RULE_CHAINS for this competition.
+TIEBREAK_RULES = os.environ.get("LEAGUE_TIEBREAK_RULES", "default")
+# Times each pair of teams meets in a season: 2 for home and away legs.
+LEGS = int(os.environ.get("LEAGUE_LEGS", "2"))
+
+# Result edits submitted within this many seconds are sent as one batch.
+WRITE_COALESCE_WINDOW = float(os.environ.get("LEAGUE_WRITE_COALESCE_WINDOW", "2"))
+
+# Finished seasons frozen to local Feather files.
+ARCHIVE_DIR = os.environ.get("LEAGUE_ARCHIVE_DIR", "archive")
+
+# Local SQLite mirror of each league's results, one file per league. Pages
+# read from the mirror and edits are synced to the sheet in the background;
+# set to an empty string to read and write the sheets directly instead.
+MIRROR_DIR = os.environ.get("LEAGUE_MIRROR_DIR", "mirror")
+
+# The timing panel and per-rerun profiling are shown only when the page is
+# opened with ?admin=<ADMIN_TOKEN>; PROFILER is "cprofile" or "pyinstrument".
+ADMIN_TOKEN = os.environ.get("LEAGUE_ADMIN_TOKEN", "")
+PROFILER = os.environ.get("LEAGUE_PROFILER", "cprofile")
+
+# Season simulations behind the title/qualification/relegation odds, and
+# the worker processes they fan out to (1 keeps them in-process).
+SIMULATIONS = int(os.environ.get("LEAGUE_SIMULATIONS", "100000"))
+SIMULATION_PROCESSES = int(os.environ.get("LEAGUE_SIMULATION_PROCESSES", "1"))
+QUALIFY_PLACES = int(os.environ.get("LEAGUE_QUALIFY_PLACES", "4"))
+RELEGATION_PLACES = int(os.environ.get("LEAGUE_RELEGATION_PLACES", "3"))
+
+# Elo ratings: starting rating, K factor and home advantage in rating
+# points. Rating state is kept in one SQLite file per league under
+# RATINGS_DIR (an empty string keeps it in memory for the process only).
+RATINGS_DIR = os.environ.get("LEAGUE_RATINGS_DIR", "ratings")
+ELO_START = float(os.environ.get("LEAGUE_ELO_START", "1500"))
+ELO_K = float(os.environ.get("LEAGUE_ELO_K", "20"))
+ELO_HOME_ADVANTAGE = float(os.environ.get("LEAGUE_ELO_HOME_ADVANTAGE", "60"))
+
+# Matches in the form guide's "last N" column and points-per-game figure.
+FORM_MATCHES = int(os.environ.get("LEAGUE_FORM_MATCHES", "5"))
+
+# Upper bound on concurrent Sheets requests from this process.
+FETCH_CONCURRENCY = int(os.environ.get("LEAGUE_FETCH_CONCURRENCY", "4"))
+
+# Seconds between background checks for spreadsheet changes.
+POLL_INTERVAL = float(os.environ.get("LEAGUE_POLL_INTERVAL", "10"))
+
+# Google Sheets allows 60 read and 60 write requests per minute per user;
+# the scheduler paces requests to these limits with a small burst allowance.
+READ_QUOTA_PER_MINUTE = int(os.environ.get("LEAGUE_READ_QUOTA_PER_MINUTE", "60"))
+WRITE_QUOTA_PER_MINUTE = int(os.environ.get("LEAGUE_WRITE_QUOTA_PER_MINUTE", "60"))
+QUOTA_BURST = int(os.environ.get("LEAGUE_QUOTA_BURST", "10"))
+MAX_RETRIES = int(os.environ.get("LEAGUE_MAX_RETRIES", "5"))
+
+# Connections kept open to Google by the shared HTTP session.
+HTTP_POOL_SIZE = int(os.environ.get("LEAGUE_HTTP_POOL_SIZE", "32"))
+
+# Live leagues kept in memory; the least recently viewed is evicted first
+# when either limit is exceeded.
+MAX_ACTIVE_LEAGUES = int(os.environ.get("LEAGUE_MAX_ACTIVE_LEAGUES", "20"))
+LEAGUE_MEMORY_BUDGET_MB = float(os.environ.get("LEAGUE_MEMORY_BUDGET_MB", "512"))
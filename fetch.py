@@ -0,0 +1,60 @@
+"""Concurrent worksheet fetching.
+
+Worksheets are read on a shared thread pool so a page showing several
+divisions or leagues waits for the slowest round trip instead of the sum of
+all of them. A process-wide semaphore caps in-flight Sheets requests so
+concurrent sessions together stay inside the per-user quota.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+import scheduler
+from sheet_cache import read_worksheet
+
+_executor = ThreadPoolExecutor(max_workers=config.FETCH_CONCURRENCY, thread_name_prefix="sheets-fetch")
+_slots = threading.BoundedSemaphore(config.FETCH_CONCURRENCY)
+
+
+def _read(worksheet, transform, loader, options):
+    with _slots:
+        return read_worksheet(worksheet, transform=transform, loader=loader, **options)
+
+
+_worksheets = {}
+
+
+def worksheets_by_title(spreadsheet, refresh=False):
+    """All worksheets of ``spreadsheet``, from one metadata request per process.
+
+    Worksheet handles are remembered; pass ``refresh=True`` (or ask for a
+    title that is not known yet, see ``fetch_worksheets``) to reload them.
+    """
+    cached = _worksheets.get(spreadsheet.id)
+    if cached is None or refresh:
+        with _slots:
+            worksheets = scheduler.read(spreadsheet.worksheets, key=("worksheets", spreadsheet.id))
+            cached = {worksheet.title: worksheet for worksheet in worksheets}
+        _worksheets[spreadsheet.id] = cached
+    return cached
+
+
+def forget(spreadsheet_id):
+    _worksheets.pop(spreadsheet_id, None)
+
+
+def fetch_worksheets(spreadsheet, titles, transform=None, loader=None, **options):
+    """Read several worksheets of one spreadsheet concurrently.
+
+    Returns ``{title: DataFrame}`` in the order of ``titles``; ``transform``,
+    ``loader`` and ``options`` are passed on to ``read_worksheet``.
+    """
+    worksheets = worksheets_by_title(spreadsheet)
+    if any(title not in worksheets for title in titles):
+        worksheets = worksheets_by_title(spreadsheet, refresh=True)
+    missing = [title for title in titles if title not in worksheets]
+    if missing:
+        raise KeyError(f"Worksheet(s) not found in {spreadsheet.title!r}: {', '.join(missing)}")
+    futures = {title: _executor.submit(_read, worksheets[title], transform, loader, options) for title in titles}
+    return {title: future.result() for title, future in futures.items()}
+
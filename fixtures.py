@@ -0,0 +1,157 @@
+"""Round-robin fixture generation.
+
+``round_robin`` pairs teams with the circle method: one team stays put while
+the rest rotate one place per round, so a whole season is a few broadcast
+numpy expressions rather than a loop over rounds. Venues alternate so that
+a single round-robin has the minimum of ``n - 2`` breaks (two home or two
+away games in a row). The second half of a double round-robin repeats the
+first with venues swapped.
+
+``schedule`` then dates the rounds (skipping blackout dates) and places each
+match at the home team's ground. Where that ground is unavailable on the
+day, the two legs of the pairing swap venues if that makes both playable;
+anything still unplayable is reported, one record per match, in the same
+Row/Column/Value/Problem shape as schema violations.
+"""
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+import scheduler
+from fetch import worksheets_by_title
+from schema import RESULTS_SCHEMA, VIOLATION_COLUMNS
+from sheet_cache import cache
+from sheet_ranges import header
+from standings import AWAY, AWAY_GOALS, DATE, HOME, HOME_GOALS, ROUND, VENUE
+from write_back import HEADER_ROWS, changed_ranges
+
+
+def round_robin(n_teams, double=True):
+    """``(home, away)`` team indices, each shaped ``(rounds, matches_per_round)``.
+
+    With an odd number of teams a bye is added and its matches dropped, so
+    every round has ``n_teams // 2`` matches.
+    """
+    if n_teams < 2:
+        return np.zeros((0, 0), dtype=np.int32), np.zeros((0, 0), dtype=np.int32)
+    n = n_teams + n_teams % 2
+    rounds = n - 1
+    round_index = np.arange(rounds)[:, None]
+    # Team 0 is fixed and meets team r + 1 in round r; the others sit on a
+    # circle of n - 1 places and pair off symmetrically around that team.
+    opponent = round_index + 1
+    fixed_home = round_index % 2 == 0
+    step = np.arange(1, n // 2)[None, :]
+    ahead = (round_index + step) % rounds + 1
+    behind = (round_index - step) % rounds + 1
+    ahead_home = step % 2 == 1
+    home = np.hstack([np.where(fixed_home, 0, opponent), np.where(ahead_home, ahead, behind)])
+    away = np.hstack([np.where(fixed_home, opponent, 0), np.where(ahead_home, behind, ahead)])
+
+    if n != n_teams:
+        # The fixed place is the bye: dropping its match leaves every other
+        # pairing's venue alternation intact.
+        keep = (home != 0) & (away != 0)
+        home = home[keep].reshape(rounds, n_teams // 2) - 1
+        away = away[keep].reshape(rounds, n_teams // 2) - 1
+    if double:
+        home, away = np.vstack([home, away]), np.vstack([away, home])
+    return home.astype(np.int32), away.astype(np.int32)
+
+
+def round_dates(start, rounds, interval=timedelta(days=7), blackouts=()):
+    """The first ``rounds`` matchdays from ``start`` every ``interval``, skipping blackout dates."""
+    blackouts = set(pd.to_datetime(list(blackouts)).date)
+    dates = []
+    day = pd.Timestamp(start).date()
+    while len(dates) < rounds:
+        if day not in blackouts:
+            dates.append(day)
+        day += interval
+    return dates
+
+
+def schedule(teams, start, venues=None, unavailable=(), blackouts=(), interval=timedelta(days=7), double=True):
+    """Dated fixtures for ``teams`` in the results schema, and the problems left over.
+
+    ``venues`` maps a team to its home ground (default ``"<team> Ground"``);
+    ``unavailable`` holds ``(venue, date)`` pairs on which a ground cannot be
+    used. Returns ``(fixtures, problems)``; fixture scores are left blank.
+    """
+    teams = list(teams)
+    venues = venues or {}
+    grounds = np.array([venues.get(team, f"{team} Ground") for team in teams], dtype=object)
+    home, away = round_robin(len(teams), double)
+    rounds, per_round = home.shape
+    dates = np.array(round_dates(start, rounds, interval, blackouts), dtype="datetime64[D]")
+
+    match_round = np.repeat(np.arange(rounds), per_round)
+    home, away = home.ravel(), away.ravel()
+
+    # Unavailable grounds as (ground code, round) keys; days that are not matchdays never clash.
+    ground_codes, ground_names = pd.factorize(grounds)
+    ground_code = {name: code for code, name in enumerate(ground_names)}
+    round_on = {day: r for r, day in enumerate(dates.astype(object))}
+    blocked = np.array([
+        ground_code[venue] * rounds + round_on[day]
+        for venue, day in ((venue, pd.Timestamp(day).date()) for venue, day in unavailable)
+        if venue in ground_code and day in round_on
+    ], dtype=np.int64)
+
+    def playable(team, match_rounds):
+        return ~np.isin(ground_codes[team].astype(np.int64) * rounds + match_rounds, blocked)
+
+    if double and len(home) and len(blocked):
+        # Leg i of the first half and leg i + half of the second are the same pairing.
+        half = len(home) // 2
+        first, second = np.arange(half), np.arange(half, 2 * half)
+        ok = playable(home[first], match_round[first]) & playable(home[second], match_round[second])
+        swapped_ok = playable(away[first], match_round[first]) & playable(away[second], match_round[second])
+        swap = first[~ok & swapped_ok]
+        for legs in (swap, swap + half):
+            home[legs], away[legs] = away[legs], home[legs].copy()
+
+    fixtures = pd.DataFrame({
+        DATE: pd.to_datetime(dates[match_round]),
+        ROUND: match_round + 1,
+        HOME: pd.Categorical.from_codes(home, categories=teams),
+        AWAY: pd.Categorical.from_codes(away, categories=teams),
+        HOME_GOALS: pd.NA,
+        AWAY_GOALS: pd.NA,
+        VENUE: pd.Categorical(grounds[home]),
+    }).astype(RESULTS_SCHEMA)
+
+    bad = np.flatnonzero(~playable(home, match_round))
+    problems = pd.DataFrame(
+        [(int(label) + HEADER_ROWS + 1, VENUE, grounds[home[label]], "venue unavailable") for label in bad],
+        columns=VIOLATION_COLUMNS,
+    )
+    return fixtures, problems
+
+
+def write_fixtures(spreadsheet, fixtures, current=None):
+    """Replace the fixture lists of several worksheets in one batch update.
+
+    ``fixtures`` maps worksheet titles to frames in the results schema;
+    ``current`` optionally maps titles to what the sheets hold now, so only
+    differing cells are sent and surplus old rows are blanked. Returns the
+    number of ranges written.
+    """
+    worksheets = worksheets_by_title(spreadsheet)
+    current = current or {}
+    data = []
+    for title, frame in fixtures.items():
+        worksheet = worksheets[title]
+        frame = frame.reset_index(drop=True)
+        names = header(worksheet, refresh=True)
+        # An empty worksheet gets the header row as well.
+        before = current.get(title, pd.DataFrame(columns=frame.columns)) if names else pd.DataFrame()
+        data.extend(changed_ranges(title, before, frame, names or None))
+        needed_rows = max(len(frame), len(before)) + HEADER_ROWS
+        if needed_rows > worksheet.row_count:
+            scheduler.write(worksheet.add_rows, needed_rows - worksheet.row_count)
+    if data:
+        scheduler.write(spreadsheet.values_batch_update, {"valueInputOption": "USER_ENTERED", "data": data})
+        cache.invalidate(spreadsheet.id)
+    return len(data)
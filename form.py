@@ -0,0 +1,109 @@
+"""Form guide and streaks.
+
+Results are reshaped once into a long frame with one row per team per
+played match, sorted by team and then in date order. Everything else
+works on whole columns of that frame:
+
+- the last ``n`` matches per team come from one ``groupby().cumcount()``;
+- runs are found by run-length encoding: a run starts wherever the team or
+  the run's condition changes, a cumulative sum of those starts numbers the
+  runs, and ``bincount`` gives their lengths.
+
+``FormGuide`` keeps the last computed frame per results version, so
+sessions viewing the same division share one computation.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+import config
+from standings import AWAY, AWAY_GOALS, HOME, HOME_GOALS, POINTS_FOR_DRAW, POINTS_FOR_WIN, chronological
+
+# Runs reported per team, and which results keep each one going.
+RUNS = {
+    "Longest Winning Run": "W",
+    "Longest Unbeaten Run": "WD",
+    "Longest Losing Run": "L",
+    "Longest Winless Run": "DL",
+}
+
+
+def team_matches(results, win=POINTS_FOR_WIN, draw=POINTS_FOR_DRAW):
+    """Long format: one row per team per played match, oldest first within each team."""
+    matches = chronological(results)
+    order = np.arange(len(matches))
+    home_goals = matches[HOME_GOALS].to_numpy()
+    away_goals = matches[AWAY_GOALS].to_numpy()
+    long = pd.DataFrame({
+        "Team": np.concatenate([matches[HOME].astype(object), matches[AWAY].astype(object)]),
+        "Opponent": np.concatenate([matches[AWAY].astype(object), matches[HOME].astype(object)]),
+        "Side": np.repeat(["H", "A"], len(matches)),
+        "GF": np.concatenate([home_goals, away_goals]),
+        "GA": np.concatenate([away_goals, home_goals]),
+        "Order": np.concatenate([order, order]),
+    })
+    outcome = np.sign(long["GF"] - long["GA"]).to_numpy() + 1
+    long["Result"] = np.array(["L", "D", "W"])[outcome]
+    long["Pts"] = np.array([0, draw, win])[outcome]
+    return long.sort_values(["Team", "Order"], kind="mergesort").reset_index(drop=True)
+
+
+def _runs(long, results):
+    """Longest run per team of consecutive matches whose result is in ``results``."""
+    inside = long["Result"].isin(list(results)).to_numpy()
+    team = long["Team"].to_numpy()
+    start = np.ones(len(long), dtype=bool)
+    start[1:] = (inside[1:] != inside[:-1]) | (team[1:] != team[:-1])
+    run = np.cumsum(start) - 1
+    length = np.bincount(run)
+    longest = pd.Series(np.where(inside[start], length, 0), index=team[start])
+    return longest.groupby(level=0).max()
+
+
+def form_table(results, last=config.FORM_MATCHES, win=POINTS_FOR_WIN, draw=POINTS_FOR_DRAW):
+    """Per-team form over the last ``last`` matches, current streak and longest runs."""
+    long = team_matches(results, win, draw)
+    if long.empty:
+        return pd.DataFrame(columns=["Form", f"PPG Last {last}", "Streak", *RUNS]).rename_axis("Team")
+    from_end = long.groupby("Team").cumcount(ascending=False)
+    recent = long[from_end < last].groupby("Team")
+    frame = pd.DataFrame({
+        "Form": recent["Result"].agg("".join),
+        f"PPG Last {last}": recent["Pts"].mean().round(2),
+    })
+
+    # The current streak is the last run of identical results.
+    result = long["Result"].to_numpy()
+    team = long["Team"].to_numpy()
+    change = np.ones(len(long), dtype=bool)
+    change[1:] = (result[1:] != result[:-1]) | (team[1:] != team[:-1])
+    run_start = np.maximum.accumulate(np.where(change, np.arange(len(long)), 0))
+    ends = long.groupby("Team").tail(1).index.to_numpy()
+    lengths = (ends - run_start[ends] + 1).astype(str)
+    frame["Streak"] = pd.Series(np.char.add(result[ends].astype(str), lengths), index=team[ends], dtype=object)
+    for name, kept in RUNS.items():
+        frame[name] = _runs(long, kept)
+    return frame.rename_axis("Team")
+
+
+class FormGuide:
+    """``form_table`` of one division, recomputed only when its results version changes."""
+
+    def __init__(self, last=config.FORM_MATCHES, win=POINTS_FOR_WIN, draw=POINTS_FOR_DRAW):
+        self.last = last
+        self.win = win
+        self.draw = draw
+        self.computed = 0
+        self._version = None
+        self._table = None
+        self._lock = threading.Lock()
+
+    def update(self, results, version):
+        """Form table for ``results``; ``version`` is the poller generation they were read at."""
+        with self._lock:
+            if version != self._version:
+                self._table = form_table(results, self.last, self.win, self.draw)
+                self._version = version
+                self.computed += 1
+            return self._table
@@ -0,0 +1,225 @@
+"""Serving several leagues from one process.
+
+Each league lives in its own spreadsheet and is described in
+``config.LEAGUES_FILE``::
+
+    {
+        "premier": {"title": "Premier League", "spreadsheet": "Premier 2026",
+                    "divisions": ["Results"], "tiebreak_rules": "default", "legs": 2},
+        "youth": {"title": "Youth League", "key": "1AbC...", "divisions": ["U12", "U14"]}
+    }
+
+A league is opened by spreadsheet ``key`` when given, otherwise by name. All
+leagues share the process-wide client and its HTTP connection pool. The live
+state of a league (local mirror or change poller, standings engines,
+snapshots, Elo ratings, form guides, cached reads) is created on first view
+and kept in an LRU registry that evicts the least recently viewed league
+once too many are active or their frames outgrow the memory budget.
+"""
+import itertools
+import json
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import config
+import fetch
+import sheet_ranges
+import write_back
+from client import get_client
+from fetch import worksheets_by_title
+from form import FormGuide
+from mirror import SheetMirror, mirror_path, read_raw
+from poller import ChangePoller
+from ratings import RatingEngine, ratings_path
+from schema import RESULTS_SCHEMA
+from sheet_cache import cache
+from snapshots import MatchdaySnapshots
+from standings import StandingsEngine
+
+log = logging.getLogger(__name__)
+
+# Tells states apart when an evicted league is rebuilt with its generations back at the start.
+_epochs = itertools.count(1)
+
+
+class League:
+    def __init__(self, key, title=None, spreadsheet=config.SPREADSHEET_NAME, spreadsheet_key=None,
+                 divisions=None, tiebreak_rules=config.TIEBREAK_RULES, legs=config.LEGS):
+        self.key = key
+        self.title = title or key
+        self.spreadsheet = spreadsheet
+        self.spreadsheet_key = spreadsheet_key
+        self.divisions = tuple(divisions or config.DIVISION_WORKSHEETS)
+        self.tiebreak_rules = tiebreak_rules
+        self.legs = legs
+
+    def open(self):
+        client = get_client()
+        if self.spreadsheet_key:
+            return client.open_by_key(self.spreadsheet_key)
+        return client.open(self.spreadsheet)
+
+
+def load_leagues(path=config.LEAGUES_FILE):
+    """``{key: League}`` from the leagues file, or the single configured league."""
+    path = Path(path)
+    if not path.exists():
+        return {config.DEFAULT_LEAGUE: League(config.DEFAULT_LEAGUE, title="League Standings")}
+    with path.open() as handle:
+        entries = json.load(handle)
+    return {
+        key: League(
+            key,
+            title=entry.get("title"),
+            spreadsheet=entry.get("spreadsheet", config.SPREADSHEET_NAME),
+            spreadsheet_key=entry.get("key"),
+            divisions=entry.get("divisions"),
+            tiebreak_rules=entry.get("tiebreak_rules", config.TIEBREAK_RULES),
+            legs=int(entry.get("legs", config.LEGS)),
+        )
+        for key, entry in entries.items()
+    }
+
+
+class LeagueState:
+    """Live per-league objects, created once and shared by every session."""
+
+    def __init__(self, league, loader):
+        self.league = league
+        self.epoch = next(_epochs)
+        if config.MIRROR_DIR:
+            self.poller = SheetMirror(mirror_path(league.key), league.open, league.divisions).start()
+        else:
+            self.poller = ChangePoller(league.open(), league.divisions, loader=loader).start()
+        self.engines = {division: StandingsEngine() for division in league.divisions}
+        self.snapshots = {division: MatchdaySnapshots() for division in league.divisions}
+        self.ratings = {division: RatingEngine(ratings_path(league.key), division) for division in league.divisions}
+        self.form = {division: FormGuide() for division in league.divisions}
+        self._memory = (None, 0)
+
+    def memory_bytes(self):
+        """Approximate footprint, re-measured only when a worksheet changed."""
+        generations = tuple(self.poller.generation(division) for division in self.league.divisions)
+        if generations != self._memory[0]:
+            total = 0
+            for division in self.league.divisions:
+                _, value = self.poller.value(division)
+                for frame in value if isinstance(value, tuple) else (value,):
+                    total += int(frame.memory_usage(deep=True).sum())
+                total += self.snapshots[division].totals.nbytes + self.snapshots[division].positions.nbytes
+            self._memory = (generations, total)
+        return self._memory[1]
+
+    @property
+    def spreadsheet(self):
+        """The league's spreadsheet; ``None`` while a mirror has not reached Google yet."""
+        return self.poller.spreadsheet
+
+    def submit(self, division, frame):
+        """Save an edited results frame for ``division``."""
+        if isinstance(self.poller, SheetMirror):
+            return self.poller.submit(division, frame)
+        # As in the mirror: find what the user changed against the parsed
+        # results, then apply only those cells to the sheet's raw values, so
+        # cells that failed to parse are not written back as blanks.
+        _, (current, _) = self.poller.value(division)
+        changes = write_back.changed_cells(
+            current, frame.reindex(columns=list(RESULTS_SCHEMA)), list(RESULTS_SCHEMA)
+        )
+        if not changes:
+            return 0
+        worksheet = worksheets_by_title(self.spreadsheet)[division]
+        raw = read_raw(worksheet)
+        writer = write_back.get_writer(worksheet, raw, config.WRITE_COALESCE_WINDOW)
+        writer.observe(raw)
+        writer.submit_changes(changes)
+        return len(changes)
+
+    def write_error(self, division):
+        """Why edits to ``division`` are still waiting to reach the sheet, or ``None``."""
+        if isinstance(self.poller, SheetMirror):
+            return self.poller.last_error if len(self.poller.pending(division)) else None
+        if self.spreadsheet is None:
+            return None
+        return write_back.failed_write(self.spreadsheet.id, division)
+
+    def close(self):
+        if isinstance(self.poller, SheetMirror):
+            self.poller.close()
+        else:
+            self.poller.stop()
+        for engine in self.ratings.values():
+            engine.close()
+        if self.spreadsheet is None:
+            return
+        spreadsheet_id = self.spreadsheet.id
+        cache.invalidate(spreadsheet_id)
+        fetch.forget(spreadsheet_id)
+        sheet_ranges.forget(spreadsheet_id)
+        write_back.forget(spreadsheet_id)
+        get_client().forget(spreadsheet_id)
+
+
+class LeagueRegistry:
+    def __init__(self, loader, max_active=config.MAX_ACTIVE_LEAGUES,
+                 memory_budget=config.LEAGUE_MEMORY_BUDGET_MB * 1024 * 1024):
+        self.loader = loader
+        self.max_active = max_active
+        self.memory_budget = memory_budget
+        self.leagues = load_leagues()
+        self.evictions = 0
+        self._states = OrderedDict()
+        self._building = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Live state for league ``key``, marking it most recently used.
+
+        A league's state is built outside the registry lock, since opening it
+        can wait on Google; only requests for that same league wait for it.
+        Evicted leagues are closed on a background thread.
+        """
+        if key not in self.leagues:
+            raise KeyError(f"Unknown league {key!r}")
+        with self._lock:
+            state = self._states.get(key)
+            if state is not None:
+                self._states.move_to_end(key)
+                return state
+            building = self._building.setdefault(key, threading.Lock())
+        with building:
+            with self._lock:
+                state = self._states.get(key)
+            if state is None:
+                state = LeagueState(self.leagues[key], self.loader)
+            with self._lock:
+                self._states[key] = state
+                self._states.move_to_end(key)
+                self._building.pop(key, None)
+                evicted = self._evict()
+        for old in evicted:
+            threading.Thread(target=old.close, name="league-close", daemon=True).start()
+        return state
+
+    def _evict(self):
+        """Drop least recently used leagues over the limits; returns their states for closing."""
+        evicted = []
+        while len(self._states) > 1 and (
+            len(self._states) > self.max_active
+            or sum(state.memory_bytes() for state in self._states.values()) > self.memory_budget
+        ):
+            key, state = self._states.popitem(last=False)
+            evicted.append(state)
+            self.evictions += 1
+            log.info("Evicted league %s", key)
+        return evicted
+
+    def stats(self):
+        with self._lock:
+            return {
+                "active": list(self._states),
+                "memory_bytes": {key: state.memory_bytes() for key, state in self._states.items()},
+                "evictions": self.evictions,
+            }
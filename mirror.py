@@ -0,0 +1,383 @@
+"""Offline-first SQLite mirror of the results worksheets.
+
+Pages read results from a local SQLite file rather than from Google Sheets,
+so a view costs one indexed query and keeps working while the Sheets API is
+slow or unreachable. A background sync worker pulls the raw schema columns
+whenever the spreadsheet's revision moves and replaces the mirrored rows.
+
+Edits are written to the mirror first and queued in an outbox together with
+the value each cell had when it was edited. The worker pushes them on its
+next pass, but first compares that base value with what the sheet holds
+now: if someone changed the cell in the sheet in the meantime the local edit
+is dropped, the sheet's value wins and the clash is recorded in the
+``conflicts`` table.
+"""
+import logging
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import config
+from fetch import fetch_worksheets, worksheets_by_title
+from schema import RESULTS_SCHEMA, coerce_results
+from sheet_cache import cache, sheet_revision
+from sheet_ranges import read_columns
+from timing import stage
+from write_back import HEADER_ROWS, changed_cells, write_changes
+
+log = logging.getLogger(__name__)
+
+COLUMNS = {name: name.lower().replace(" ", "_") for name in RESULTS_SCHEMA}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    sheet TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    {columns},
+    PRIMARY KEY (sheet, row)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_round ON results (sheet, round);
+CREATE INDEX IF NOT EXISTS results_home ON results (sheet, home_team);
+CREATE INDEX IF NOT EXISTS results_away ON results (sheet, away_team);
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY,
+    sheet TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    field TEXT NOT NULL,
+    base,
+    value,
+    queued_at REAL NOT NULL,
+    UNIQUE (sheet, row, field)
+);
+CREATE TABLE IF NOT EXISTS conflicts (
+    id INTEGER PRIMARY KEY,
+    sheet TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    field TEXT NOT NULL,
+    base,
+    local,
+    remote,
+    detected_at REAL NOT NULL
+);
+""".format(columns=",\n    ".join(COLUMNS.values()))
+
+
+def mirror_path(league_key):
+    return Path(config.MIRROR_DIR) / f"{league_key}.sqlite"
+
+
+def _stored(value):
+    """Cell value as stored in SQLite: blanks become NULL."""
+    if value is None or value is pd.NA or value == "":
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+def read_raw(worksheet):
+    """The schema columns of ``worksheet`` as unformatted sheet values."""
+    return read_columns(worksheet, list(RESULTS_SCHEMA))
+
+
+class SheetMirror:
+    """Local copy of several results worksheets plus the sync worker that keeps it current.
+
+    Serves the same ``generation``/``value`` interface as ``ChangePoller``, so
+    the app reads from either one the same way.
+    """
+
+    def __init__(self, path, open_spreadsheet, titles, interval=config.POLL_INTERVAL,
+                 write_window=config.WRITE_COALESCE_WINDOW):
+        self.path = Path(path)
+        self.open_spreadsheet = open_spreadsheet
+        self.titles = list(titles)
+        self.interval = interval
+        self.write_window = write_window
+        self.spreadsheet = None
+        self.syncs = 0
+        self.failures = 0
+        self.last_synced = None
+        self.last_error = None
+        self._revision = None
+        self._values = {}
+        self._generations = dict.fromkeys(self.titles, 0)
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._timer = None
+        self._thread = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        for title in self.titles:
+            if self._query("SELECT 1 FROM results WHERE sheet = ? LIMIT 1", (title,)):
+                self._generations[title] = 1
+
+    def _query(self, sql, parameters=()):
+        with self._db_lock:
+            return self._db.execute(sql, parameters).fetchall()
+
+    # -- reads -------------------------------------------------------------
+
+    def raw(self, title):
+        """Mirrored cells of ``title`` in the ``get_as_dataframe`` index layout."""
+        with stage("mirror_read", worksheet=title), self._db_lock:
+            frame = pd.read_sql_query(
+                f"SELECT row, {', '.join(COLUMNS.values())} FROM results WHERE sheet = ? ORDER BY row",
+                self._db,
+                params=(title,),
+            )
+        frame.index = pd.Index(frame.pop("row").to_numpy() - HEADER_ROWS - 1)
+        return frame.rename(columns={column: name for name, column in COLUMNS.items()}).astype(object)
+
+    def generation(self, title):
+        with self._lock:
+            return self._generations[title]
+
+    def value(self, title):
+        """Latest ``(generation, (results, violations))`` for ``title``."""
+        with self._lock:
+            generation = self._generations[title]
+            cached = self._values.get(title)
+        if cached is not None and cached[0] == generation:
+            return cached
+        raw = self.raw(title)
+        with stage("parse", worksheet=title):
+            value = coerce_results(raw)
+        with self._lock:
+            self._values[title] = (generation, value)
+        return generation, value
+
+    def _bump(self, title):
+        with self._lock:
+            self._generations[title] += 1
+
+    # -- local writes ------------------------------------------------------
+
+    def submit(self, title, frame):
+        """Apply an edited results frame to the mirror and queue its changes for the sheet."""
+        _, (current, _) = self.value(title)
+        raw = self.raw(title)
+        changes = changed_cells(current, frame.reindex(columns=list(RESULTS_SCHEMA)), list(RESULTS_SCHEMA))
+        if not changes:
+            return 0
+        now = time.time()
+        with self._db_lock, self._db:
+            self._db.execute("BEGIN")
+            for (label, name), value in changes.items():
+                row = label + HEADER_ROWS + 1
+                base = _stored(raw.at[label, name]) if label in raw.index else None
+                value = _stored(value)
+                self._db.execute(
+                    "INSERT INTO outbox (sheet, row, field, base, value, queued_at) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (sheet, row, field) DO UPDATE SET value = excluded.value, queued_at = excluded.queued_at",
+                    (title, row, name, base, value, now),
+                )
+                self._db.execute(
+                    f"INSERT INTO results (sheet, row, {COLUMNS[name]}) VALUES (?, ?, ?) "
+                    f"ON CONFLICT (sheet, row) DO UPDATE SET {COLUMNS[name]} = excluded.{COLUMNS[name]}",
+                    (title, row, value),
+                )
+            self._db.execute("DELETE FROM outbox WHERE sheet = ? AND base IS value", (title,))
+        self._bump(title)
+        self._schedule_push()
+        return len(changes)
+
+    def _schedule_push(self):
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Timer(self.write_window, self._push_due)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _push_due(self):
+        with self._lock:
+            self._timer = None
+        self._wake.set()
+
+    def pending(self, title=None):
+        """Queued edits not yet in the sheet."""
+        sql = "SELECT sheet, row, field, base, value, queued_at FROM outbox"
+        with self._db_lock:
+            if title is None:
+                return pd.read_sql_query(sql + " ORDER BY id", self._db)
+            return pd.read_sql_query(sql + " WHERE sheet = ? ORDER BY id", self._db, params=(title,))
+
+    def conflicts(self, title=None):
+        """Local edits that lost to a newer change made directly in the sheet."""
+        sql = "SELECT sheet, row, field, base, local, remote, detected_at FROM conflicts"
+        with self._db_lock:
+            if title is None:
+                return pd.read_sql_query(sql + " ORDER BY id", self._db)
+            return pd.read_sql_query(sql + " WHERE sheet = ? ORDER BY id", self._db, params=(title,))
+
+    # -- sync --------------------------------------------------------------
+
+    def _reconcile(self, title, sheet, edits):
+        """Sheet frame with the non-conflicting ``edits`` applied, and the conflicts found."""
+        after = sheet.copy()
+        conflicts = []
+        for _, row, name, base, value, _ in edits:
+            label = row - HEADER_ROWS - 1
+            remote = _stored(sheet.at[label, name]) if label in sheet.index and name in sheet.columns else None
+            if remote == value:
+                continue
+            if remote != base:
+                conflicts.append((title, row, name, base, value, remote))
+                continue
+            if label not in after.index:
+                after.loc[label] = None
+            after.at[label, name] = value
+        return after.sort_index(), conflicts
+
+    def _store(self, title, frame):
+        """Replace the mirrored rows of ``title``; returns whether anything changed."""
+        frame = frame.reindex(columns=list(RESULTS_SCHEMA))
+        rows = sorted(
+            (int(label) + HEADER_ROWS + 1, *map(_stored, values))
+            for label, values in zip(frame.index, frame.itertuples(index=False, name=None))
+            if any(_stored(value) is not None for value in values)
+        )
+        columns = ", ".join(COLUMNS.values())
+        with self._db_lock, self._db:
+            current = self._db.execute(
+                f"SELECT row, {columns} FROM results WHERE sheet = ? ORDER BY row", (title,)
+            ).fetchall()
+            if current == rows:
+                return False
+            self._db.execute("BEGIN")
+            self._db.execute("DELETE FROM results WHERE sheet = ?", (title,))
+            self._db.executemany(
+                f"INSERT INTO results (sheet, row, {columns}) VALUES (?, ?, {', '.join('?' * len(COLUMNS))})",
+                [(title, *row) for row in rows],
+            )
+        return True
+
+    def sync_once(self):
+        """Push queued edits and pull changed worksheets; returns the titles whose rows changed."""
+        with self._sync_lock, stage("sync", mirror=self.path.name):
+            if self.spreadsheet is None:
+                self.spreadsheet = self.open_spreadsheet()
+            spreadsheet = self.spreadsheet
+            outbox = self._query("SELECT id, row, field, base, value, queued_at, sheet FROM outbox ORDER BY id")
+            revision = sheet_revision(spreadsheet)
+            if revision == self._revision and not outbox:
+                return []
+            cache.invalidate(spreadsheet.id)
+            sheets = fetch_worksheets(spreadsheet, self.titles, loader=read_raw)
+
+            changed = []
+            for title, sheet in sheets.items():
+                edits = [(id_, row, name, base, value, queued_at)
+                         for id_, row, name, base, value, queued_at, sheet_title in outbox if sheet_title == title]
+                if edits:
+                    after, conflicts = self._reconcile(title, sheet, edits)
+                    write_changes(worksheets_by_title(spreadsheet)[title], sheet, after)
+                    now = time.time()
+                    with self._db_lock, self._db:
+                        self._db.execute("BEGIN")
+                        self._db.executemany(
+                            "INSERT INTO conflicts (sheet, row, field, base, local, remote, detected_at) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            [conflict + (now,) for conflict in conflicts],
+                        )
+                        # Edits made while this push was under way keep their newer timestamp and stay queued.
+                        self._db.executemany(
+                            "DELETE FROM outbox WHERE id = ? AND queued_at = ?",
+                            [(edit[0], edit[-1]) for edit in edits],
+                        )
+                    if conflicts:
+                        log.warning("%d edit(s) to %s conflicted with the sheet; kept the sheet's values",
+                                    len(conflicts), title)
+                    sheet = after
+                for _, row, name, _, value, _ in self._query(
+                    "SELECT id, row, field, base, value, queued_at FROM outbox WHERE sheet = ?", (title,)
+                ):
+                    label = row - HEADER_ROWS - 1
+                    if label not in sheet.index:
+                        sheet.loc[label] = None
+                    sheet.at[label, name] = value
+                if self._store(title, sheet):
+                    self._bump(title)
+                    changed.append(title)
+            self._revision = None if outbox else revision
+            self.syncs += 1
+            self.last_synced = time.time()
+            self.last_error = None
+        if changed:
+            log.info("Mirrored changes in %s: %s", spreadsheet.title, ", ".join(changed))
+        return changed
+
+    def _sync_logged(self):
+        try:
+            return self.sync_once()
+        except Exception as error:
+            self.failures += 1
+            self.last_error = repr(error)
+            log.warning("Syncing %s failed; serving the local mirror", self.path, exc_info=True)
+            return []
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if not self._stop.is_set():
+                self._sync_logged()
+
+    def start(self):
+        """Start the sync worker.
+
+        A mirror that already holds every worksheet serves it straight away
+        and syncs in the background; an empty one syncs before returning.
+        """
+        if self._thread is None:
+            if all(self._generations.values()):
+                self._wake.set()
+            else:
+                self._sync_logged()
+            self._thread = threading.Thread(target=self._run, name="sheets-mirror", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def close(self):
+        """Stop the worker, wait for a sync in progress and close the database.
+
+        Edits still in the outbox stay in the file and are pushed by the
+        next mirror opened on it.
+        """
+        self.stop()
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if self._thread is not None:
+            self._thread.join()
+        with self._sync_lock, self._db_lock:
+            self._db.close()
+
+    def status(self):
+        (pending,), = self._query("SELECT COUNT(*) FROM outbox")
+        (conflicts,), = self._query("SELECT COUNT(*) FROM conflicts")
+        return {
+            "path": str(self.path),
+            "pending_edits": pending,
+            "conflicts": conflicts,
+            "syncs": self.syncs,
+            "failures": self.failures,
+            "last_synced": self.last_synced,
+            "last_error": self.last_error,
+        }
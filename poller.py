@@ -0,0 +1,89 @@
+"""Background change feed for open dashboards.
+
+One poller per spreadsheet checks the Drive file version every few seconds.
+When it moves, the subscribed worksheets are re-read once for the whole
+process and fingerprinted; only worksheets whose content actually changed
+get a new generation number. Sessions render each table inside a fragment
+that compares generations, so a change to one division re-renders one table
+and nobody re-runs the whole script or re-reads every sheet.
+"""
+import logging
+import threading
+
+import pandas as pd
+
+import config
+from fetch import fetch_worksheets
+from sheet_cache import cache, sheet_revision
+
+log = logging.getLogger(__name__)
+
+
+def fingerprint(value):
+    frames = value if isinstance(value, tuple) else (value,)
+    return tuple(int(pd.util.hash_pandas_object(frame, index=True).sum()) for frame in frames)
+
+
+class ChangePoller:
+    def __init__(self, spreadsheet, titles, transform=None, loader=None, interval=config.POLL_INTERVAL):
+        self.spreadsheet = spreadsheet
+        self.titles = list(titles)
+        self.transform = transform
+        self.loader = loader
+        self.interval = interval
+        self.polls = 0
+        self._revision = None
+        self._values = {}
+        self._fingerprints = {}
+        self._generations = dict.fromkeys(self.titles, 0)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def poll_once(self):
+        """Check the revision and refresh changed worksheets; returns the changed titles."""
+        self.polls += 1
+        revision = sheet_revision(self.spreadsheet)
+        if revision == self._revision:
+            return []
+        cache.invalidate(self.spreadsheet.id)
+        values = fetch_worksheets(self.spreadsheet, self.titles, transform=self.transform, loader=self.loader)
+        changed = []
+        with self._lock:
+            for title, value in values.items():
+                digest = fingerprint(value)
+                if digest != self._fingerprints.get(title):
+                    self._fingerprints[title] = digest
+                    self._values[title] = value
+                    self._generations[title] += 1
+                    changed.append(title)
+            self._revision = revision
+        if changed:
+            log.info("Worksheets changed in %s: %s", self.spreadsheet.title, ", ".join(changed))
+        return changed
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll_once()
+            except Exception:
+                log.exception("Polling %s failed", self.spreadsheet.title)
+
+    def start(self):
+        if self._thread is None:
+            self.poll_once()
+            self._thread = threading.Thread(target=self._run, name="sheets-poller", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def generation(self, title):
+        with self._lock:
+            return self._generations[title]
+
+    def value(self, title):
+        """Latest ``(generation, value)`` for ``title``."""
+        with self._lock:
+            return self._generations[title], self._values[title]
@@ -0,0 +1,204 @@
+"""Elo ratings over the results history, updated incrementally.
+
+Played matches are rated in a fixed order (date, then round, then sheet
+row). Every rated match is logged in SQLite with both teams' ratings before
+it and the points that changed hands, so the current ratings are always
+``start + sum(deltas)`` and never need the full history again. On each
+update the newly ordered matches are compared with the log by sheet row and
+content fingerprint: the matching prefix is kept, and rating resumes from
+the first match that differs. New results at the end therefore cost one
+step each, while a corrected old result rewinds only to that match.
+
+``replay`` rates the whole history from scratch without touching the log,
+and ``audit`` compares the two, for checking the stored ratings after
+corrections. Both paths share ``_step`` and rate in the same order, so they
+agree exactly.
+"""
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import config
+from standings import AWAY, AWAY_GOALS, HOME, HOME_GOALS, chronological
+from write_back import HEADER_ROWS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rated (
+    sheet TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    row INTEGER NOT NULL,
+    fingerprint INTEGER NOT NULL,
+    home_team TEXT NOT NULL,
+    away_team TEXT NOT NULL,
+    home_before REAL NOT NULL,
+    away_before REAL NOT NULL,
+    delta REAL NOT NULL,
+    PRIMARY KEY (sheet, seq)
+) WITHOUT ROWID;
+"""
+
+LOG_COLUMNS = ["Row", "Home Team", "Away Team", "Home Before", "Away Before", "Delta"]
+
+
+def ratings_path(league_key):
+    """Ratings file for a league; in memory (rebuilt per process) when ``RATINGS_DIR`` is empty."""
+    if not config.RATINGS_DIR:
+        return ":memory:"
+    return Path(config.RATINGS_DIR) / f"{league_key}.sqlite"
+
+
+def rating_order(results):
+    """Played matches in rating order, with a content fingerprint per match."""
+    frame = chronological(results)
+    fingerprints = pd.util.hash_pandas_object(frame[[HOME, AWAY, HOME_GOALS, AWAY_GOALS]], index=False)
+    frame["fingerprint"] = fingerprints.to_numpy().view(np.int64)
+    return frame
+
+
+def expected_score(home_rating, away_rating, home_advantage=config.ELO_HOME_ADVANTAGE):
+    """Expected points share of the home side (win 1, draw 0.5)."""
+    return 1 / (1 + 10 ** ((away_rating - home_rating - home_advantage) / 400))
+
+
+def _step(home_rating, away_rating, home_goals, away_goals, k, home_advantage):
+    """Rating points moving from the away side to the home side in one match."""
+    margin = abs(home_goals - away_goals)
+    # Wider wins move more points, as in the World Football Elo ratings.
+    weight = 1 if margin <= 1 else 1.5 if margin == 2 else (11 + margin) / 8
+    score = 1.0 if home_goals > away_goals else 0.5 if home_goals == away_goals else 0.0
+    return k * weight * (score - expected_score(home_rating, away_rating, home_advantage))
+
+
+def _rate(matches, ratings, start, k, home_advantage):
+    """Rate ``matches`` in order, updating ``ratings`` in place; returns the log rows."""
+    log = []
+    for row, home, away, home_goals, away_goals in zip(
+        matches.index, matches[HOME], matches[AWAY], matches[HOME_GOALS], matches[AWAY_GOALS]
+    ):
+        home_before = ratings.get(home, start)
+        away_before = ratings.get(away, start)
+        delta = _step(home_before, away_before, int(home_goals), int(away_goals), k, home_advantage)
+        ratings[home] = home_before + delta
+        ratings[away] = away_before - delta
+        log.append((int(row) + HEADER_ROWS + 1, home, away, home_before, away_before, delta))
+    return log
+
+
+def replay(results, start=config.ELO_START, k=config.ELO_K, home_advantage=config.ELO_HOME_ADVANTAGE):
+    """Rate the whole history from scratch: ``(ratings, log)`` without touching any stored state."""
+    ratings = {}
+    log = _rate(rating_order(results), ratings, start, k, home_advantage)
+    return pd.Series(ratings, name="Elo", dtype=float).rename_axis("Team"), pd.DataFrame(log, columns=LOG_COLUMNS)
+
+
+class RatingEngine:
+    """Persisted Elo state for one results worksheet."""
+
+    def __init__(self, path, sheet, start=config.ELO_START, k=config.ELO_K,
+                 home_advantage=config.ELO_HOME_ADVANTAGE):
+        self.sheet = sheet
+        self.start = start
+        self.k = k
+        self.home_advantage = home_advantage
+        self.rated = 0
+        self.rewinds = 0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        stored = self._db.execute(
+            "SELECT row, fingerprint FROM rated WHERE sheet = ? ORDER BY seq", (sheet,)
+        ).fetchall()
+        self._rows = [row for row, _ in stored]
+        self._fingerprints = [fingerprint for _, fingerprint in stored]
+        self._ratings = self._ratings_before(len(stored))
+
+    def _ratings_before(self, seq):
+        """Ratings after the first ``seq`` logged matches, summed in the same order as they were rated."""
+        ratings = {}
+        for home, away, delta in self._db.execute(
+            "SELECT home_team, away_team, delta FROM rated WHERE sheet = ? AND seq < ? ORDER BY seq", (self.sheet, seq)
+        ):
+            ratings[home] = ratings.get(home, self.start) + delta
+            ratings[away] = ratings.get(away, self.start) - delta
+        return ratings
+
+    def update(self, results):
+        """Fold newly entered or corrected results into the ratings; returns them as a Series."""
+        with self._lock:
+            self._update(results)
+            return self.ratings()
+
+    def _update(self, results):
+        matches = rating_order(results)
+        rows = (matches.index.to_numpy() + HEADER_ROWS + 1).tolist()
+        fingerprints = matches["fingerprint"].tolist()
+        common = min(len(rows), len(self._rows))
+        same = (np.array(rows[:common]) == np.array(self._rows[:common], dtype=np.int64)) & (
+            np.array(fingerprints[:common], dtype=np.int64) == np.array(self._fingerprints[:common], dtype=np.int64)
+        )
+        kept = common if same.all() else int(np.argmin(same))
+        if kept == len(self._rows) == len(rows):
+            return
+        if kept < len(self._rows):
+            # An already rated match changed, moved or went away: resume from just before it.
+            self._ratings = self._ratings_before(kept)
+            self.rewinds += 1
+
+        log = _rate(matches.iloc[kept:], self._ratings, self.start, self.k, self.home_advantage)
+        with self._db:
+            self._db.execute("BEGIN")
+            self._db.execute("DELETE FROM rated WHERE sheet = ? AND seq >= ?", (self.sheet, kept))
+            self._db.executemany(
+                "INSERT INTO rated VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (self.sheet, kept + offset, row, fingerprint, home, away, home_before, away_before, delta)
+                    for offset, ((row, home, away, home_before, away_before, delta), fingerprint)
+                    in enumerate(zip(log, fingerprints[kept:]))
+                ],
+            )
+        self._rows = rows
+        self._fingerprints = fingerprints
+        # Teams whose every match was removed drop out.
+        teams = set(matches[HOME]) | set(matches[AWAY])
+        self._ratings = {team: rating for team, rating in self._ratings.items() if team in teams}
+        self.rated += len(log)
+
+    def ratings(self):
+        """Current ratings, highest first."""
+        return pd.Series(self._ratings, name="Elo", dtype=float).rename_axis("Team").sort_values(ascending=False)
+
+    def log(self):
+        """The stored per-match rating log, in rating order."""
+        with self._lock:
+            stored = self._db.execute(
+                "SELECT row, home_team, away_team, home_before, away_before, delta FROM rated "
+                "WHERE sheet = ? ORDER BY seq",
+                (self.sheet,),
+            ).fetchall()
+        return pd.DataFrame(stored, columns=LOG_COLUMNS)
+
+    def audit(self, results):
+        """Log entries where the stored state differs from a full replay of ``results``."""
+        _, expected = replay(results, self.start, self.k, self.home_advantage)
+        stored = self.log()
+        if len(stored) != len(expected):
+            return pd.concat([stored.assign(Source="stored"), expected.assign(Source="replay")], ignore_index=True)
+        different = ~(stored == expected).all(axis=1)
+        return pd.concat(
+            [stored[different].assign(Source="stored"), expected[different].assign(Source="replay")]
+        ).sort_index(kind="mergesort")
+
+    def predict(self, home, away):
+        """Expected home points share for a fixture between two rated (or new) teams."""
+        return expected_score(self._ratings.get(home, self.start), self._ratings.get(away, self.start),
+                              self.home_advantage)
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,159 @@
+"""Quota-aware gate for every Google Sheets request.
+
+Reads and writes each draw from a token bucket sized to the per-user
+per-minute quota, so a burst of sessions queues briefly instead of tripping
+429s. Requests that still fail with 429 or a 5xx are retried with
+exponential backoff and full jitter. Identical reads already in flight are
+coalesced: later callers wait for the first call's result instead of
+sending their own.
+
+gspread is not imported here: the scheduler sits under every module the
+first page loads, and gspread is only needed once a request actually fails.
+"""
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+import config
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _status(error):
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def _retryable(error):
+    from gspread.exceptions import APIError
+
+    return isinstance(error, APIError) and _status(error) in RETRY_STATUSES
+
+
+class TokenBucket:
+    def __init__(self, per_minute, burst):
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available; returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class RequestScheduler:
+    def __init__(
+        self,
+        read_per_minute=config.READ_QUOTA_PER_MINUTE,
+        write_per_minute=config.WRITE_QUOTA_PER_MINUTE,
+        burst=config.QUOTA_BURST,
+        max_retries=config.MAX_RETRIES,
+        base_delay=1.0,
+        max_delay=32.0,
+    ):
+        self._buckets = {
+            "read": TokenBucket(read_per_minute, burst),
+            "write": TokenBucket(write_per_minute, burst),
+        }
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._stats = {
+            "calls": 0,
+            "retries": 0,
+            "coalesced": 0,
+            "failures": 0,
+            "max_queue_depth": 0,
+            "wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _acquire(self, kind):
+        with self._lock:
+            self._queued += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._queued)
+        try:
+            waited = self._buckets[kind].acquire()
+        finally:
+            with self._lock:
+                self._queued -= 1
+                self._stats["wait_seconds"] += waited
+                self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], waited)
+
+    def _execute(self, kind, function, args, kwargs):
+        for attempt in range(self.max_retries + 1):
+            self._acquire(kind)
+            self._count("calls")
+            try:
+                return function(*args, **kwargs)
+            except Exception as error:
+                if not _retryable(error) or attempt == self.max_retries:
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                time.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+
+    def read(self, function, *args, key=None, **kwargs):
+        """Run a read; calls sharing a ``key`` while one is in flight share its result."""
+        if key is None:
+            return self._execute("read", function, args, kwargs)
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+            else:
+                self._stats["coalesced"] += 1
+        if not owner:
+            return future.result()
+        try:
+            future.set_result(self._execute("read", function, args, kwargs))
+        except BaseException as error:
+            future.set_exception(error)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        return future.result()
+
+    def write(self, function, *args, **kwargs):
+        return self._execute("write", function, args, kwargs)
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["queue_depth"] = self._queued
+            stats["in_flight_reads"] = len(self._in_flight)
+        stats["mean_wait_seconds"] = stats["wait_seconds"] / stats["calls"] if stats["calls"] else 0.0
+        return stats
+
+
+scheduler = RequestScheduler()
+
+
+def read(function, *args, key=None, **kwargs):
+    return scheduler.read(function, *args, key=key, **kwargs)
+
+
+def write(function, *args, **kwargs):
+    return scheduler.write(function, *args, **kwargs)
@@ -0,0 +1,102 @@
+"""Fixed, compact schema for the results sheet.
+
+``get_as_dataframe`` hands back object columns padded with the sheet's empty
+grid. ``coerce_results`` trims that padding and converts every column to its
+schema dtype. Cells that do not fit are set to NA and reported, one record
+per problem, instead of failing the load.
+"""
+import pandas as pd
+
+from standings import AWAY, AWAY_GOALS, DATE, HOME, HOME_GOALS, ROUND, VENUE
+
+RESULTS_SCHEMA = {
+    DATE: "datetime64[ns]",
+    ROUND: "Int16",
+    HOME: "category",
+    AWAY: "category",
+    HOME_GOALS: "Int8",
+    AWAY_GOALS: "Int8",
+    VENUE: "category",
+}
+
+VIOLATION_COLUMNS = ["Row", "Column", "Value", "Problem"]
+
+MAX_GOALS = 99
+
+# Day zero of Google Sheets date serial numbers.
+SHEETS_EPOCH = pd.Timestamp("1899-12-30")
+
+
+def _blank(series):
+    if series.dtype.kind in "biufcmM":
+        return series.isna()
+    return series.isna() | series.astype("string").str.strip().eq("")
+
+
+def _trim(frame, blank):
+    keep_columns = [
+        column for column in frame.columns
+        if not (str(column).startswith("Unnamed:") and blank[column].all())
+    ]
+    keep_rows = ~blank[keep_columns].all(axis=1)
+    return frame.loc[keep_rows, keep_columns], blank.loc[keep_rows, keep_columns]
+
+
+def _dates(series):
+    """Sheet date cells: serial day numbers (``SERIAL_NUMBER`` reads) or ISO 8601 text."""
+    if series.dtype.kind == "M":
+        return series
+    serial = pd.to_numeric(series, errors="coerce")
+    text = pd.to_datetime(series.where(serial.isna()), errors="coerce", format="ISO8601")
+    return text.fillna(SHEETS_EPOCH + pd.to_timedelta(serial, unit="D"))
+
+
+def _integers(series, low, high):
+    numbers = pd.to_numeric(series, errors="coerce")
+    valid = numbers.notna() & (numbers % 1 == 0) & numbers.between(low, high)
+    return numbers.where(valid), valid
+
+
+def coerce_results(frame, header_rows=1):
+    """Return ``(typed_frame, violations)`` for a raw results frame.
+
+    The index is kept, so ``Row`` in the violations (index + header + 1)
+    is the sheet row and write-back can still map rows to the sheet.
+    """
+    # ``apply`` on a frame without rows gives object columns, which pandas 3 cannot combine with ``&``.
+    frame, blank = _trim(frame, frame.apply(_blank).astype(bool))
+    problems = [(None, column, None, "missing column") for column in RESULTS_SCHEMA if column not in frame.columns]
+    columns = list(RESULTS_SCHEMA) + [column for column in frame.columns if column not in RESULTS_SCHEMA]
+    raw = frame.reindex(columns=columns)
+    blank = blank.reindex(columns=columns, fill_value=True).astype(bool)
+    frame = raw.copy()
+
+    def report(mask, column, problem):
+        for label in raw.index[mask]:
+            problems.append((int(label) + header_rows + 1, column, raw.at[label, column], problem))
+
+    dates = _dates(raw[DATE].where(~blank[DATE]))
+    report(~blank[DATE] & dates.isna(), DATE, "invalid date")
+    frame[DATE] = dates.astype(RESULTS_SCHEMA[DATE])
+
+    rounds, valid = _integers(raw[ROUND], 1, 32767)
+    report(~blank[ROUND] & ~valid, ROUND, "invalid round")
+    frame[ROUND] = rounds.astype(RESULTS_SCHEMA[ROUND])
+
+    for column in (HOME_GOALS, AWAY_GOALS):
+        goals, valid = _integers(raw[column], 0, MAX_GOALS)
+        report(~blank[column] & ~valid, column, "invalid score")
+        frame[column] = goals.astype(RESULTS_SCHEMA[column])
+    report(blank[HOME_GOALS] != blank[AWAY_GOALS], HOME_GOALS, "incomplete score")
+
+    names = {column: raw[column].where(~blank[column]).astype("string").str.strip() for column in (HOME, AWAY)}
+    for column in (HOME, AWAY):
+        report(blank[column], column, "missing team")
+    report(~blank[HOME] & (names[HOME] == names[AWAY]).fillna(False), AWAY, "team plays itself")
+    teams = pd.CategoricalDtype(sorted(set(names[HOME].dropna()) | set(names[AWAY].dropna())))
+    for column in (HOME, AWAY):
+        frame[column] = names[column].astype(object).astype(teams)
+    frame[VENUE] = raw[VENUE].where(~blank[VENUE]).astype("string").str.strip().astype("category")
+
+    violations = pd.DataFrame(problems, columns=VIOLATION_COLUMNS)
+    return frame, violations
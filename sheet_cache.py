@@ -0,0 +1,152 @@
+"""Shared read cache for worksheet DataFrames.
+
+Entries are keyed by spreadsheet id + worksheet + range and served until the
+TTL runs out or the spreadsheet's Drive revision moves on. The revision is a
+single small metadata request, and is itself memoised for a few seconds so a
+burst of viewers costs one check rather than one per rerun.
+"""
+import threading
+import time
+
+import pandas as pd
+
+import config
+import scheduler
+from timing import stage
+
+DRIVE_FILE_URL = "https://www.googleapis.com/drive/v3/files/{}"
+
+
+def sheet_revision(spreadsheet):
+    response = scheduler.read(
+        spreadsheet.client.request,
+        "get",
+        DRIVE_FILE_URL.format(spreadsheet.id),
+        params={"fields": "version"},
+        key=("revision", spreadsheet.id),
+    )
+    return response.json()["version"]
+
+
+def _read_range(worksheet, a1_range):
+    a1_range = f"'{worksheet.title}'!{a1_range}"
+    response = scheduler.read(worksheet.spreadsheet.values_get, a1_range, key=("values", worksheet.spreadsheet.id, a1_range))
+    values = response.get("values", [])
+    if not values:
+        return pd.DataFrame()
+    header, rows = values[0], values[1:]
+    width = len(header)
+    rows = [row + [""] * (width - len(row)) if len(row) < width else row[:width] for row in rows]
+    return pd.DataFrame(rows, columns=header).replace("", None)
+
+
+class _Entry:
+    __slots__ = ("frame", "revision", "fetched_at")
+
+    def __init__(self, frame, revision, fetched_at):
+        self.frame = frame
+        self.revision = revision
+        self.fetched_at = fetched_at
+
+
+class SheetCache:
+    def __init__(self, ttl=config.SHEET_CACHE_TTL, revision_interval=config.REVISION_CHECK_INTERVAL):
+        self.ttl = ttl
+        self.revision_interval = revision_interval
+        self._entries = {}
+        self._revisions = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.revision_changes = 0
+        self.revision_checks = 0
+
+    def _revision(self, spreadsheet):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._revisions.get(spreadsheet.id)
+            if cached is not None and now - cached[1] < self.revision_interval:
+                return cached[0]
+        revision = sheet_revision(spreadsheet)
+        with self._lock:
+            self.revision_checks += 1
+            self._revisions[spreadsheet.id] = (revision, now)
+        return revision
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def read(self, worksheet, a1_range=None, transform=None, loader=None, **options):
+        """Return the worksheet (or ``a1_range`` of it) as a DataFrame.
+
+        ``options`` are passed to ``get_as_dataframe`` for whole-sheet reads;
+        a ``loader(worksheet)`` callable replaces ``get_as_dataframe``
+        entirely. If ``transform`` is given, its result for the frame is
+        cached and returned instead. The returned value is shared between
+        callers and must not be mutated.
+        """
+        spreadsheet = worksheet.spreadsheet
+        key = (spreadsheet.id, worksheet.title, a1_range, transform, loader, repr(sorted(options.items())))
+        with self._key_lock(key):
+            revision = self._revision(spreadsheet)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.monotonic() - entry.fetched_at >= self.ttl:
+                    self.expired += 1
+                elif entry.revision != revision:
+                    self.revision_changes += 1
+                else:
+                    self.hits += 1
+                    return entry.frame
+
+            self.misses += 1
+            if loader is not None:
+                frame = loader(worksheet)
+            elif a1_range is None:
+                from gspread_dataframe import get_as_dataframe
+
+                with stage("fetch", worksheet=worksheet.title, via="get_as_dataframe"):
+                    frame = scheduler.read(
+                        get_as_dataframe, worksheet, key=("grid", spreadsheet.id, worksheet.title, key[-1]), **options
+                    )
+            else:
+                frame = _read_range(worksheet, a1_range)
+            if transform is not None:
+                frame = transform(frame)
+            self._entries[key] = _Entry(frame, revision, time.monotonic())
+            return frame
+
+    def invalidate(self, spreadsheet_id=None, worksheet_title=None):
+        with self._lock:
+            for key in list(self._entries):
+                if spreadsheet_id is not None and key[0] != spreadsheet_id:
+                    continue
+                if worksheet_title is not None and key[1] != worksheet_title:
+                    continue
+                del self._entries[key]
+            if spreadsheet_id is None:
+                self._revisions.clear()
+            else:
+                self._revisions.pop(spreadsheet_id, None)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "expired": self.expired,
+            "revision_changes": self.revision_changes,
+            "revision_checks": self.revision_checks,
+            "entries": len(self._entries),
+        }
+
+
+cache = SheetCache()
+
+
+def read_worksheet(worksheet, a1_range=None, transform=None, loader=None, **options):
+    return cache.read(worksheet, a1_range, transform, loader, **options)
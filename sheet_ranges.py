@@ -0,0 +1,101 @@
+"""Range-limited worksheet reads.
+
+Rather than pulling the whole grid through ``get_as_dataframe``, the header
+row is read once to find where each needed column lives, and after that
+only those columns are requested, as open-ended ``C2:C`` ranges in a single
+``values_batch_get``. The values API already stops at the last non-empty
+row, so the empty trailing grid and unused columns never leave Google.
+Frames keep the ``get_as_dataframe`` index convention (label ``i`` is sheet
+row ``i + 2``) so write-back can still map rows to the sheet.
+"""
+import threading
+
+import pandas as pd
+
+import scheduler
+from schema import RESULTS_SCHEMA, coerce_results
+from timing import stage
+
+HEADER_ROW = 1
+
+_headers = {}
+_lock = threading.Lock()
+
+
+def _quoted(title):
+    return "'{}'".format(title.replace("'", "''"))
+
+
+def column_letter(index):
+    """1-based column index to its A1 letters."""
+    letters = ""
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def header(worksheet, refresh=False):
+    """Column names of ``worksheet``'s header row, cached per worksheet."""
+    key = (worksheet.spreadsheet.id, worksheet.title)
+    with _lock:
+        cached = _headers.get(key)
+    if cached is None or refresh:
+        a1_range = f"{_quoted(worksheet.title)}!{HEADER_ROW}:{HEADER_ROW}"
+        response = scheduler.read(
+            worksheet.spreadsheet.values_get, a1_range, key=("values", worksheet.spreadsheet.id, a1_range)
+        )
+        values = response.get("values", [])
+        cached = [str(name).strip() for name in (values[0] if values else [])]
+        with _lock:
+            _headers[key] = cached
+    return cached
+
+
+def forget(spreadsheet_id):
+    with _lock:
+        for key in [key for key in _headers if key[0] == spreadsheet_id]:
+            del _headers[key]
+
+
+def column_positions(worksheet, columns):
+    """``{name: 1-based sheet column}`` for the ``columns`` present in the header."""
+    names = header(worksheet)
+    if any(column not in names for column in columns):
+        names = header(worksheet, refresh=True)
+    return {column: names.index(column) + 1 for column in columns if column in names}
+
+
+def read_columns(worksheet, columns):
+    """Read only ``columns`` (below the header) into an object DataFrame."""
+    positions = column_positions(worksheet, columns)
+    if not positions:
+        return pd.DataFrame(columns=list(columns))
+    first_row = HEADER_ROW + 1
+    ranges = [
+        f"{_quoted(worksheet.title)}!{column_letter(position)}{first_row}:{column_letter(position)}"
+        for position in positions.values()
+    ]
+    with stage("fetch", worksheet=worksheet.title, via="values_batch_get"):
+        response = scheduler.read(
+            worksheet.spreadsheet.values_batch_get,
+            ranges,
+            params={
+                "majorDimension": "COLUMNS",
+                "valueRenderOption": "UNFORMATTED_VALUE",
+                "dateTimeRenderOption": "SERIAL_NUMBER",
+            },
+            key=("columns", worksheet.spreadsheet.id, tuple(ranges)),
+        )
+    series = []
+    for name, value_range in zip(positions, response.get("valueRanges", [])):
+        values = value_range.get("values", [])
+        series.append(pd.Series(values[0] if values else [], name=name, dtype=object))
+    return pd.concat(series, axis=1)
+
+
+def read_results(worksheet):
+    """Schema-typed results and their violations, reading only schema columns."""
+    raw = read_columns(worksheet, list(RESULTS_SCHEMA))
+    with stage("parse", worksheet=worksheet.title):
+        return coerce_results(raw)
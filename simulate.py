@@ -0,0 +1,228 @@
+"""Monte Carlo season simulation.
+
+Every remaining fixture is sampled for a whole batch of seasons at once:
+goals are Poisson draws shaped ``(seasons, matches)`` from per-team attack
+and defence strengths fitted to the results so far, and the simulated
+tables are added up by multiplying those arrays with a match-to-team
+incidence matrix rather than looping over seasons or matches. Each
+simulated table is then ordered by the same rule chain as the live table,
+head-to-head rules included: tie groups are tracked per season as integer
+ids and the mini-tables come from the matches whose two teams share a group
+in that season.
+
+Batches can fan out over a process pool. Results are cached per content of
+the results frame, so a page only simulates again after a score changes.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import config
+from standings import (
+    AWAY, AWAY_GOALS, HOME, HOME_GOALS, LEGS, POINTS_FOR_DRAW, POINTS_FOR_WIN, played, remaining_fixtures, teams,
+)
+from tiebreakers import HEAD_TO_HEAD_RULES, TABLE_RULES, resolve_chain
+
+BATCH = 10_000
+
+# Pseudo-matches at league-average strength mixed into every team's record,
+# so a team with few games played is not rated on one or two scores.
+PRIOR_MATCHES = 3
+
+
+class Fixtures:
+    """Played and remaining matches as team-index arrays.
+
+    Remaining matches are those of ``standings.remaining_fixtures``: unplayed
+    fixtures in the sheet plus any round-robin meeting (``legs`` per pair) it
+    does not list.
+    """
+
+    def __init__(self, results, legs=LEGS):
+        self.team_names = sorted(teams(results))
+        index = pd.Index(self.team_names)
+        scored = played(results)
+        self.home = index.get_indexer(scored[HOME].astype(object))
+        self.away = index.get_indexer(scored[AWAY].astype(object))
+        self.home_goals = scored[HOME_GOALS].to_numpy(dtype=np.int64)
+        self.away_goals = scored[AWAY_GOALS].to_numpy(dtype=np.int64)
+        remaining = remaining_fixtures(results, legs)
+        self.remaining_home = index.get_indexer(remaining[HOME])
+        self.remaining_away = index.get_indexer(remaining[AWAY])
+
+    def scoring_rates(self):
+        """Expected home and away goals for every remaining match."""
+        n = len(self.team_names)
+        matches = len(self.home_goals)
+        home_average = self.home_goals.mean() if matches else 1.5
+        away_average = self.away_goals.mean() if matches else 1.1
+        per_team = (home_average + away_average) / 2
+        played_ = np.bincount(self.home, minlength=n) + np.bincount(self.away, minlength=n) + PRIOR_MATCHES
+        scored = (
+            np.bincount(self.home, self.home_goals, n) + np.bincount(self.away, self.away_goals, n)
+            + PRIOR_MATCHES * per_team
+        )
+        conceded = (
+            np.bincount(self.home, self.away_goals, n) + np.bincount(self.away, self.home_goals, n)
+            + PRIOR_MATCHES * per_team
+        )
+        attack = scored / played_ / per_team
+        defence = conceded / played_ / per_team
+        home, away = self.remaining_home, self.remaining_away
+        return home_average * attack[home] * defence[away], away_average * attack[away] * defence[home]
+
+
+class _Matches:
+    """Per-match stat values and their mapping onto teams, for fixed or simulated scores.
+
+    Goals are ``(seasons, matches)`` arrays, or ``(1, matches)`` for matches
+    already played, which then broadcast against every simulated season.
+    """
+
+    def __init__(self, home, away, home_goals, away_goals, n_teams, win, draw):
+        self.home = home
+        self.away = away
+        self.home_incidence = np.zeros((len(home), n_teams), dtype=np.float32)
+        self.home_incidence[np.arange(len(home)), home] = 1
+        self.away_incidence = np.zeros((len(away), n_teams), dtype=np.float32)
+        self.away_incidence[np.arange(len(away)), away] = 1
+        difference = home_goals.astype(np.int16) - away_goals
+        outcome = np.sign(difference) + 1
+        points = np.array([0, draw, win], dtype=np.float32)
+        self.values = {
+            "Pts": (points[outcome], points[2 - outcome]),
+            "GF": (home_goals.astype(np.float32), away_goals.astype(np.float32)),
+            "GD": (difference.astype(np.float32), -difference.astype(np.float32)),
+            "W": ((outcome == 2).astype(np.float32), (outcome == 0).astype(np.float32)),
+        }
+
+    def totals(self, stat, groups=None):
+        """Per-team sums of ``stat``; with ``groups``, only over matches inside a tie group."""
+        home_values, away_values = self.values[stat]
+        if groups is not None:
+            inside = groups[:, self.home] == groups[:, self.away]
+            home_values, away_values = home_values * inside, away_values * inside
+        return home_values @ self.home_incidence + away_values @ self.away_incidence
+
+
+def _regroup(groups, key):
+    """Split each season's tie groups further by ``key``."""
+    span = int(key.max() - key.min()) + 1
+    combined = groups * span + (key - key.min())
+    return np.unique(combined, return_inverse=True)[1].reshape(groups.shape)
+
+
+def _positions(matches, seasons, n_teams, chain):
+    """1-based finishing position of every team in every simulated season.
+
+    ``matches`` is a list of ``_Matches`` that together make up the season.
+    """
+    keys = []
+    groups = np.zeros((seasons, n_teams), dtype=np.int64)
+    mini = None
+    for rule in chain:
+        if rule in TABLE_RULES:
+            mini = None
+            key = sum(part.totals(TABLE_RULES[rule]) for part in matches)
+        else:
+            if mini is None:
+                mini, mini_groups = {}, groups
+            stat = HEAD_TO_HEAD_RULES[rule]
+            if stat not in mini:
+                mini[stat] = sum(part.totals(stat, mini_groups) for part in matches)
+            key = mini[stat]
+        keys.append(np.broadcast_to(np.rint(key).astype(np.int64), (seasons, n_teams)))
+        groups = _regroup(groups, keys[-1])
+
+    # Ties left after the chain fall back to team name, as in the live table.
+    names = np.broadcast_to(np.arange(n_teams), (seasons, n_teams))
+    order = np.lexsort([names] + [-key for key in reversed(keys)], axis=-1)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(1, n_teams + 1)[None, :], axis=-1)
+    return positions
+
+
+def _simulate_batch(fixtures, home_rate, away_rate, seasons, seed, chain, win, draw):
+    """Position counts (teams x positions) over ``seasons`` simulated seasons."""
+    rng = np.random.default_rng(seed)
+    remaining = len(home_rate)
+    n_teams = len(fixtures.team_names)
+    matches = [
+        _Matches(fixtures.home, fixtures.away, fixtures.home_goals[None, :], fixtures.away_goals[None, :],
+                 n_teams, win, draw),
+        _Matches(fixtures.remaining_home, fixtures.remaining_away,
+                 rng.poisson(home_rate, (seasons, remaining)).astype(np.int16),
+                 rng.poisson(away_rate, (seasons, remaining)).astype(np.int16), n_teams, win, draw),
+    ]
+    positions = _positions(matches, seasons, n_teams, chain)
+    cells = (np.arange(n_teams)[None, :] * n_teams + positions - 1).ravel()
+    return np.bincount(cells, minlength=n_teams * n_teams).reshape(n_teams, n_teams)
+
+
+def _run_batch(arguments):
+    return _simulate_batch(*arguments)
+
+
+def position_counts(results, seasons=config.SIMULATIONS, rules="default", win=POINTS_FOR_WIN, draw=POINTS_FOR_DRAW,
+                    processes=config.SIMULATION_PROCESSES, seed=None, legs=LEGS):
+    """How often each team finished in each position, as a teams x positions frame."""
+    chain = resolve_chain(rules)
+    fixtures = Fixtures(results, legs)
+    n_teams = len(fixtures.team_names)
+    index = pd.Index(fixtures.team_names, name="Team")
+    columns = pd.RangeIndex(1, n_teams + 1, name="Position")
+    if not n_teams:
+        # A new division, or a mirror that has not reached the sheet yet.
+        return pd.DataFrame(np.zeros((0, 0), dtype=np.int64), index=index, columns=columns)
+    home_rate, away_rate = fixtures.scoring_rates()
+    sizes = [BATCH] * (seasons // BATCH) + ([seasons % BATCH] if seasons % BATCH else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    batches = [
+        (fixtures, home_rate, away_rate, size, batch_seed, chain, win, draw) for size, batch_seed in zip(sizes, seeds)
+    ]
+    if processes > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            counts = sum(pool.map(_run_batch, batches))
+    else:
+        counts = sum(map(_run_batch, batches))
+    return pd.DataFrame(
+        counts if len(batches) else np.zeros((n_teams, n_teams), dtype=np.int64), index=index, columns=columns
+    )
+
+
+def outlook(counts, qualify=config.QUALIFY_PLACES, relegate=config.RELEGATION_PLACES):
+    """Title, qualification and relegation probabilities and expected position per team."""
+    share = counts.div(counts.sum(axis=1).replace(0, 1), axis=0)
+    positions = counts.columns.to_numpy()
+    frame = pd.DataFrame({
+        "Title %": share[1] * 100 if len(positions) else 0.0,
+        f"Top {qualify} %": share.loc[:, positions <= qualify].sum(axis=1) * 100,
+        "Relegation %": share.loc[:, positions > len(positions) - relegate].sum(axis=1) * 100 if relegate else 0.0,
+        "Expected Pos": share.mul(positions, axis=1).sum(axis=1),
+    })
+    return frame.sort_values("Expected Pos").round(1).reset_index()
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+CACHE_SIZE = 32
+
+
+def cached_outlook(results, seasons=config.SIMULATIONS, rules="default", win=POINTS_FOR_WIN, draw=POINTS_FOR_DRAW,
+                   legs=LEGS):
+    """``outlook`` of ``results``, simulated once per distinct results content."""
+    digest = int(pd.util.hash_pandas_object(results[[HOME, AWAY, HOME_GOALS, AWAY_GOALS]], index=True).sum())
+    key = (digest, seasons, rules if isinstance(rules, str) else tuple(rules), win, draw, legs)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    value = outlook(position_counts(results, seasons, rules, win, draw, legs=legs))
+    with _cache_lock:
+        _cache[key] = value
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return value
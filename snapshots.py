@@ -0,0 +1,185 @@
+"""Cumulative standings after every matchday.
+
+The index holds a ``rounds x teams x stats`` integer array of running
+totals plus each team's position after every round, so "table as of round
+N" and a team's position history are plain array lookups. Rounds are
+indexed up to the latest round whose fixtures all have scores; snapshot N
+counts every played match from rounds up to N. When further rounds
+complete only their matches are added on top of the last snapshot; an edit
+to an already indexed round (such as a postponed match being played), or a
+new team, rebuilds the index.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from standings import (
+    AWAY, AWAY_GOALS, COUNT_COLUMNS, HOME, HOME_GOALS, POINTS_FOR_DRAW, POINTS_FOR_WIN, ROUND, TABLE_COLUMNS,
+)
+from tiebreakers import rank
+
+STATS = COUNT_COLUMNS + ["GD", "Pts"]
+
+
+def indexable_rounds(results):
+    """Sorted round numbers up to the latest round in which every fixture has a score."""
+    rounds = pd.to_numeric(results[ROUND], errors="coerce")
+    scored = results[HOME_GOALS].notna() & results[AWAY_GOALS].notna()
+    complete = scored.groupby(rounds).all()
+    if not complete.any():
+        return []
+    last = complete.index[complete.to_numpy()].max()
+    return [int(round_) for round_ in complete.index if round_ <= last]
+
+
+def round_deltas(results, rounds, team_names, win=POINTS_FOR_WIN, draw=POINTS_FOR_DRAW):
+    """Per-round stat increments, shape ``(len(rounds), len(team_names), len(STATS))``."""
+    deltas = np.zeros((len(rounds), len(team_names), len(STATS)), dtype=np.int32)
+    round_numbers = pd.to_numeric(results[ROUND], errors="coerce")
+    frame = results[round_numbers.isin(rounds)]
+    frame = frame[frame[HOME_GOALS].notna() & frame[AWAY_GOALS].notna()]
+    if frame.empty:
+        return deltas
+
+    round_index = pd.Index(rounds).get_indexer(pd.to_numeric(frame[ROUND]).astype(int))
+    team_index = pd.Index(team_names)
+    home = team_index.get_indexer(frame[HOME].astype(object))
+    away = team_index.get_indexer(frame[AWAY].astype(object))
+    home_goals = frame[HOME_GOALS].to_numpy(dtype=np.int32)
+    away_goals = frame[AWAY_GOALS].to_numpy(dtype=np.int32)
+
+    for team, goals_for, goals_against in ((home, home_goals, away_goals), (away, away_goals, home_goals)):
+        won = goals_for > goals_against
+        drawn = goals_for == goals_against
+        lost = goals_for < goals_against
+        stats = np.column_stack([
+            np.ones_like(goals_for), won, drawn, lost, goals_for, goals_against,
+            goals_for - goals_against, won * win + drawn * draw,
+        ]).astype(np.int32)
+        np.add.at(deltas, (round_index, team), stats)
+    return deltas
+
+
+def positions(totals, team_names):
+    """1-based position of every team after every round (Pts, GD, GF, name).
+
+    All rounds are ranked in a single lexsort with the round as the primary
+    key, so the flat order splits into one block of teams per round.
+    """
+    rounds, teams = totals.shape[:2]
+    round_index = np.repeat(np.arange(rounds), teams)
+    name_rank = np.tile(np.argsort(np.argsort(np.asarray(team_names, dtype=object))), rounds)
+    flat = totals.reshape(rounds * teams, len(STATS))
+    order = np.lexsort((
+        name_rank,
+        -flat[:, STATS.index("GF")],
+        -flat[:, STATS.index("GD")],
+        -flat[:, STATS.index("Pts")],
+        round_index,
+    ))
+    result = np.empty((rounds, teams), dtype=np.int32)
+    result[round_index, order % teams] = np.tile(np.arange(1, teams + 1, dtype=np.int32), rounds)
+    return result
+
+
+def played_rounds(results):
+    """Sorted round numbers with at least one scored match."""
+    scored = results[HOME_GOALS].notna() & results[AWAY_GOALS].notna()
+    rounds = pd.to_numeric(results.loc[scored, ROUND], errors="coerce").dropna().unique()
+    return sorted(int(round_) for round_ in rounds)
+
+
+def position_race(results, win=POINTS_FOR_WIN, draw=POINTS_FOR_DRAW):
+    """Every team's position, points and goal difference after every played round.
+
+    Builds the round x team increment matrix once, takes its cumulative sum
+    down the rounds and ranks all rounds together. Returns a long frame with
+    Round, Team, Position, Pts and GD columns.
+    """
+    rounds = played_rounds(results)
+    team_names = sorted(set(results[HOME].dropna().astype(str)) | set(results[AWAY].dropna().astype(str)))
+    totals = np.cumsum(round_deltas(results, rounds, team_names, win, draw), axis=0, dtype=np.int32)
+    ranks = positions(totals, team_names)
+    return pd.DataFrame({
+        "Round": np.repeat(rounds, len(team_names)),
+        "Team": np.tile(team_names, len(rounds)),
+        "Position": ranks.ravel(),
+        "Pts": totals[..., STATS.index("Pts")].ravel(),
+        "GD": totals[..., STATS.index("GD")].ravel(),
+    })
+
+
+class MatchdaySnapshots:
+    def __init__(self, win=POINTS_FOR_WIN, draw=POINTS_FOR_DRAW):
+        self.win = win
+        self.draw = draw
+        self.rounds = []
+        self.team_names = []
+        self.totals = np.zeros((0, 0, len(STATS)), dtype=np.int32)
+        self.positions = np.zeros((0, 0), dtype=np.int32)
+        self._fingerprint = None
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+        self.appends = 0
+
+    def _fingerprint_of(self, results, rounds):
+        rows = results.loc[
+            pd.to_numeric(results[ROUND], errors="coerce").isin(rounds), [ROUND, HOME, AWAY, HOME_GOALS, AWAY_GOALS]
+        ]
+        return int(pd.util.hash_pandas_object(rows.astype(object), index=True).sum())
+
+    def update(self, results):
+        """Bring the index up to date with ``results``; returns self."""
+        with self._lock:
+            rounds = indexable_rounds(results)
+            names = sorted(set(results[HOME].dropna().astype(str)) | set(results[AWAY].dropna().astype(str)))
+            if (
+                names != self.team_names
+                or rounds[: len(self.rounds)] != self.rounds
+                or self._fingerprint_of(results, self.rounds) != self._fingerprint
+            ):
+                self.team_names = names
+                self.rounds = []
+                self.totals = np.zeros((0, len(names), len(STATS)), dtype=np.int32)
+                self.positions = np.zeros((0, len(names)), dtype=np.int32)
+                self.rebuilds += 1
+            elif len(rounds) > len(self.rounds):
+                self.appends += 1
+
+            new_rounds = rounds[len(self.rounds):]
+            if new_rounds:
+                deltas = round_deltas(results, new_rounds, self.team_names, self.win, self.draw)
+                if len(self.rounds):
+                    deltas[0] += self.totals[-1]
+                totals = np.cumsum(deltas, axis=0, dtype=np.int32)
+                self.totals = np.concatenate([self.totals, totals])
+                self.positions = np.concatenate([self.positions, positions(totals, self.team_names)])
+                self.rounds = self.rounds + new_rounds
+            self._fingerprint = self._fingerprint_of(results, self.rounds)
+        return self
+
+    def table_at(self, round_number, results=None, rules=None):
+        """Standings after ``round_number`` (the latest indexed round at or before it).
+
+        Without ``rules`` teams are ordered by Pts, GD, GF and name. With a
+        tiebreak chain and the ``results`` the index was built from, the
+        table is ranked like the live one, head-to-head counting only
+        matches up to that round.
+        """
+        r = np.searchsorted(self.rounds, round_number, side="right") - 1
+        if r < 0:
+            raise KeyError(f"No completed round at or before {round_number}")
+        table = pd.DataFrame(self.totals[r], columns=STATS)
+        table.insert(0, "Team", self.team_names)
+        table.insert(0, "Pos", self.positions[r])
+        table = table.sort_values("Pos")[["Pos"] + TABLE_COLUMNS].reset_index(drop=True)
+        if rules is None:
+            return table
+        so_far = results[pd.to_numeric(results[ROUND], errors="coerce") <= self.rounds[r]]
+        return rank(table, so_far, rules, self.win, self.draw)
+
+    def position_history(self, team=None):
+        """Positions per round: one team as a Series, or every team as a frame."""
+        history = pd.DataFrame(self.positions, index=pd.Index(self.rounds, name="Round"), columns=self.team_names)
+        return history if team is None else history[team]
@@ -0,0 +1,269 @@
+"""League table computation.
+
+``compute_standings`` rebuilds the table from the full results frame.
+``StandingsEngine`` keeps per-team totals between reruns and only folds in
+the rows that changed since the previous call; both go through the same
+aggregation and finishing steps so they produce identical tables.
+``split_standings`` builds the overall, home, away and half-season tables
+together from one pass over the played matches.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+DATE = "Date"
+ROUND = "Round"
+HOME = "Home Team"
+AWAY = "Away Team"
+HOME_GOALS = "Home Goals"
+AWAY_GOALS = "Away Goals"
+VENUE = "Venue"
+
+RESULT_COLUMNS = [HOME, AWAY, HOME_GOALS, AWAY_GOALS]
+COUNT_COLUMNS = ["P", "W", "D", "L", "GF", "GA"]
+TABLE_COLUMNS = ["Team", "P", "W", "D", "L", "GF", "GA", "GD", "Pts"]
+
+POINTS_FOR_WIN = 3
+POINTS_FOR_DRAW = 1
+# Meetings per pair of teams in a season (a double round-robin).
+LEGS = 2
+
+
+def played(results):
+    """Rows of ``results`` that have both teams and a numeric score."""
+    frame = results[RESULT_COLUMNS].copy()
+    frame[HOME_GOALS] = pd.to_numeric(frame[HOME_GOALS], errors="coerce")
+    frame[AWAY_GOALS] = pd.to_numeric(frame[AWAY_GOALS], errors="coerce")
+    frame = frame.dropna()
+    frame[HOME_GOALS] = frame[HOME_GOALS].astype("int64")
+    frame[AWAY_GOALS] = frame[AWAY_GOALS].astype("int64")
+    return frame
+
+
+def chronological(results):
+    """Played matches with their date and round, oldest first (undated last, then by sheet row)."""
+    frame = played(results).join(results[[DATE, ROUND]]).sort_index()
+    frame[ROUND] = pd.to_numeric(frame[ROUND], errors="coerce")
+    return frame.sort_values([DATE, ROUND], na_position="last", kind="mergesort")
+
+
+def teams(results):
+    names = pd.unique(results[[HOME, AWAY]].to_numpy().ravel())
+    return pd.Index([name for name in names if isinstance(name, str) and name], name="Team")
+
+
+def remaining_fixtures(results, legs=LEGS):
+    """Home and away team of every match still to play, as a frame.
+
+    Listed fixtures without a score count, and so do the meetings of a
+    ``legs``-fold round-robin that the sheet does not list at all: each team
+    hosts every other ``legs // 2`` times, and an odd last leg is added once
+    per pair (hosted by whichever team the sheet names first). Sheets that only
+    record played matches are then still mid-season until every pair has met
+    ``legs`` times.
+    """
+    team_index = teams(results)
+    n = len(team_index)
+    listed = results.dropna(subset=[HOME, AWAY])
+    home = team_index.get_indexer(listed[HOME].astype(object))
+    away = team_index.get_indexer(listed[AWAY].astype(object))
+    known = (home >= 0) & (away >= 0)
+    meetings = np.zeros((n, n), dtype=np.int64)
+    np.add.at(meetings, (home[known], away[known]), 1)
+    unlisted = np.maximum(legs // 2 - meetings, 0)
+    np.fill_diagonal(unlisted, 0)
+    if legs % 2:
+        met = meetings + unlisted
+        unlisted += np.triu(np.maximum(legs - met - met.T, 0), 1)
+    missing_home, missing_away = np.nonzero(unlisted)
+    times = unlisted[missing_home, missing_away]
+    missing_home, missing_away = np.repeat(missing_home, times), np.repeat(missing_away, times)
+
+    unplayed = known & ~listed.index.isin(played(results).index)
+    names = team_index.to_numpy()
+    return pd.DataFrame({
+        HOME: np.concatenate([names[home[unplayed]], names[missing_home]]),
+        AWAY: np.concatenate([names[away[unplayed]], names[missing_away]]),
+    })
+
+
+def team_rows(results):
+    """Long format: one row per team per played match, with P/W/D/L/GF/GA."""
+    frame = played(results)
+    home_goals = frame[HOME_GOALS].to_numpy()
+    away_goals = frame[AWAY_GOALS].to_numpy()
+    long = pd.DataFrame({
+        "Team": np.concatenate([frame[HOME].to_numpy(), frame[AWAY].to_numpy()]),
+        "GF": np.concatenate([home_goals, away_goals]),
+        "GA": np.concatenate([away_goals, home_goals]),
+    })
+    long["P"] = 1
+    long["W"] = (long["GF"] > long["GA"]).astype("int64")
+    long["D"] = (long["GF"] == long["GA"]).astype("int64")
+    long["L"] = (long["GF"] < long["GA"]).astype("int64")
+    return long
+
+
+def aggregate(results):
+    totals = team_rows(results).groupby("Team")[COUNT_COLUMNS].sum()
+    return totals.astype("int64")
+
+
+def finish(totals, team_index, win=POINTS_FOR_WIN, draw=POINTS_FOR_DRAW):
+    """Turn per-team totals into a sorted table with positions."""
+    table = totals.reindex(team_index, fill_value=0).astype("int64")
+    table["GD"] = table["GF"] - table["GA"]
+    table["Pts"] = table["W"] * win + table["D"] * draw
+    table = table.rename_axis("Team").reset_index()
+    table = table.sort_values(
+        ["Pts", "GD", "GF", "Team"], ascending=[False, False, False, True], kind="mergesort"
+    )
+    table.insert(0, "Pos", range(1, len(table) + 1))
+    return table[["Pos"] + TABLE_COLUMNS].reset_index(drop=True)
+
+
+def compute_standings(results, win=POINTS_FOR_WIN, draw=POINTS_FOR_DRAW):
+    return finish(aggregate(results), teams(results), win, draw)
+
+
+def split_standings(results, halves=False, win=POINTS_FOR_WIN, draw=POINTS_FOR_DRAW, rules=None, legs=LEGS):
+    """Overall, home and away tables (plus first and second half with ``halves``) in one frame.
+
+    Every played match is counted once into a ``(side, half, team, stat)``
+    array; each split is a sum over some of its axes, and all splits are
+    ordered by one lexsort, or by the ``rules`` chain of ``tiebreakers.rank``
+    when given. The result is indexed by ``(Split, Pos)``; ``split_table``
+    picks one table out of it. The season is as many rounds as the sheet
+    lists, or a ``legs``-fold round-robin if that is longer, and the first
+    half is every round up to half of that; matches without a round number
+    count towards the first.
+    """
+    frame = played(results)
+    team_index = teams(results)
+    n = len(team_index)
+    rounds = pd.to_numeric(results[ROUND], errors="coerce")
+    listed = rounds.max() if rounds.notna().any() else 0
+    season = max(float(listed), legs * (n - 1 + n % 2))
+    second = (rounds.loc[frame.index] > season / 2).to_numpy()
+
+    home_goals = frame[HOME_GOALS].to_numpy()
+    away_goals = frame[AWAY_GOALS].to_numpy()
+    goals_for = np.concatenate([home_goals, away_goals])
+    goals_against = np.concatenate([away_goals, home_goals])
+    stats = np.stack([
+        np.ones_like(goals_for),
+        goals_for > goals_against,
+        goals_for == goals_against,
+        goals_for < goals_against,
+        goals_for,
+        goals_against,
+    ], axis=1).astype("int64")
+    side = np.repeat([0, 1], len(frame))
+    team = team_index.get_indexer(np.concatenate([frame[HOME].to_numpy(), frame[AWAY].to_numpy()]))
+    cell = (side * 2 + np.tile(second, 2)) * n + team
+    counts = np.stack(
+        [np.bincount(cell, stats[:, column], 4 * n) for column in range(len(COUNT_COLUMNS))], axis=-1
+    ).astype("int64").reshape(2, 2, n, len(COUNT_COLUMNS))
+
+    splits = {"Overall": counts.sum(axis=(0, 1)), "Home": counts[0].sum(axis=0), "Away": counts[1].sum(axis=0)}
+    if halves:
+        splits["First Half"] = counts[:, 0].sum(axis=0)
+        splits["Second Half"] = counts[:, 1].sum(axis=0)
+
+    stacked = pd.DataFrame(np.concatenate(list(splits.values())), columns=COUNT_COLUMNS)
+    stacked.insert(0, "Team", np.tile(team_index.to_numpy(), len(splits)))
+    stacked["GD"] = stacked["GF"] - stacked["GA"]
+    stacked["Pts"] = stacked["W"] * win + stacked["D"] * draw
+    split = np.repeat(np.arange(len(splits)), n)
+    order = np.lexsort([
+        stacked["Team"].to_numpy(), -stacked["GF"].to_numpy(), -stacked["GD"].to_numpy(),
+        -stacked["Pts"].to_numpy(), split,
+    ])
+    stacked = stacked.iloc[order]
+    index = pd.MultiIndex.from_arrays(
+        [np.repeat(list(splits), n), np.tile(np.arange(1, n + 1), len(splits))], names=["Split", "Pos"]
+    )
+    if rules is not None and n:
+        from tiebreakers import rank  # tiebreakers imports this module
+
+        # Head-to-head rules look at the matches of the split's own half.
+        half_results = {
+            "First Half": results.loc[frame.index[~second]], "Second Half": results.loc[frame.index[second]],
+        }
+        stacked = pd.concat([
+            rank(stacked.iloc[position * n:(position + 1) * n], half_results.get(name, results), rules, win, draw)
+            for position, name in enumerate(splits)
+        ])
+    stacked.index = index
+    return stacked[TABLE_COLUMNS]
+
+
+def split_table(splits, name):
+    """The ``name`` table of a ``split_standings`` frame, indexed by ``Pos``; empty when there are no teams."""
+    if name not in splits.index.get_level_values("Split"):
+        return pd.DataFrame(columns=TABLE_COLUMNS, index=pd.Index([], name="Pos"))
+    return splits.loc[name]
+
+
+class StandingsEngine:
+    """Keeps running per-team totals and applies result deltas.
+
+    Rows are identified by their index label (the sheet row). New rows are
+    added to the totals and edited rows are retracted and re-added. If rows
+    disappear, or most of the sheet changed at once, the totals are rebuilt
+    from scratch instead.
+    """
+
+    def __init__(self, win=POINTS_FOR_WIN, draw=POINTS_FOR_DRAW, rebuild_fraction=0.5):
+        self.win = win
+        self.draw = draw
+        self.rebuild_fraction = rebuild_fraction
+        self._rows = None
+        self._fingerprints = None
+        self._totals = None
+        self.full_rebuilds = 0
+        self.incremental_updates = 0
+        self._lock = threading.Lock()
+
+    def _rebuild(self, rows, fingerprints):
+        self._totals = aggregate(rows)
+        self._rows = rows
+        self._fingerprints = fingerprints
+        self.full_rebuilds += 1
+
+    def update(self, results):
+        with self._lock:
+            return self._update(results)
+
+    def _update(self, results):
+        rows = results[RESULT_COLUMNS].copy()
+        fingerprints = pd.util.hash_pandas_object(rows, index=False)
+
+        if self._fingerprints is None or not self._fingerprints.index.isin(fingerprints.index).all():
+            self._rebuild(rows, fingerprints)
+            return self.table(rows)
+
+        added = fingerprints.index.difference(self._fingerprints.index)
+        common = self._fingerprints.index
+        edited = common[fingerprints.loc[common].to_numpy() != self._fingerprints.to_numpy()]
+
+        if len(added) + len(edited) > self.rebuild_fraction * max(len(rows), 1):
+            self._rebuild(rows, fingerprints)
+            return self.table(rows)
+
+        if len(added) or len(edited):
+            totals = self._totals
+            if len(edited):
+                totals = totals.sub(aggregate(self._rows.loc[edited]), fill_value=0)
+            totals = totals.add(aggregate(rows.loc[added.append(edited)]), fill_value=0)
+            self._totals = totals[(totals != 0).any(axis=1)].astype("int64")
+            self.incremental_updates += 1
+
+        self._rows = rows
+        self._fingerprints = fingerprints
+        return self.table(rows)
+
+    def table(self, results=None):
+        results = self._rows if results is None else results
+        return finish(self._totals, teams(results), self.win, self.draw)
@@ -0,0 +1,60 @@
+"""Clinch bounds must hold for every way the remaining games can end."""
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from clinch import position_bounds
+from fixtures import schedule
+from standings import AWAY, AWAY_GOALS, HOME, HOME_GOALS, compute_standings, remaining_fixtures
+
+MAX_REMAINING = 7
+
+
+def true_positions(table, results, legs):
+    """Best and worst position on points over every W/D/L outcome of the remaining games.
+
+    Level points count for the team in the best case and against it in the
+    worst, as the bounds only claim positions that hold on points alone. Once
+    nothing is left to play the table itself, tiebreakers included, is final.
+    """
+    names = sorted(table["Team"])
+    remaining = remaining_fixtures(results, legs)
+    if remaining.empty:
+        position = table.set_index("Team")["Pos"].reindex(names)
+        return pd.DataFrame({"Best": position, "Worst": position})
+    points = table.set_index("Team")["Pts"].reindex(names).to_numpy()
+    home = pd.Index(names).get_indexer(remaining[HOME])
+    away = pd.Index(names).get_indexer(remaining[AWAY])
+    games = len(remaining)
+    outcomes = np.array(list(itertools.product([0, 1, 2], repeat=games)), dtype=np.int64).reshape(3 ** games, games)
+    totals = np.tile(points, (len(outcomes), 1))
+    for game, (h, a) in enumerate(zip(home, away)):
+        np.add.at(totals, (np.arange(len(outcomes)), h), np.array([0, 1, 3])[outcomes[:, game]])
+        np.add.at(totals, (np.arange(len(outcomes)), a), np.array([3, 1, 0])[outcomes[:, game]])
+    above = (totals[:, None, :] > totals[:, :, None]).sum(axis=2)
+    level_or_above = (totals[:, None, :] >= totals[:, :, None]).sum(axis=2)
+    return pd.DataFrame(
+        {"Best": 1 + above.min(axis=0), "Worst": level_or_above.max(axis=0)}, index=pd.Index(names, name="Team")
+    )
+
+
+@pytest.mark.parametrize("legs", [1, 2])
+@pytest.mark.parametrize("seed", range(100))
+def test_bounds_are_sound(seed, legs):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(3, 6))
+    results, _ = schedule([f"Team {letter}" for letter in "ABCDE"[:n]], "2026-08-01", double=legs == 2)
+    remaining = int(rng.integers(0, min(MAX_REMAINING, len(results)) + 1))
+    scored = rng.permutation(len(results))[remaining:]
+    results[HOME_GOALS] = pd.array([pd.NA] * len(results), dtype="Int64")
+    results[AWAY_GOALS] = pd.array([pd.NA] * len(results), dtype="Int64")
+    results.iloc[scored, results.columns.get_loc(HOME_GOALS)] = rng.integers(0, 4, len(scored))
+    results.iloc[scored, results.columns.get_loc(AWAY_GOALS)] = rng.integers(0, 4, len(scored))
+
+    table = compute_standings(results)
+    bounds = position_bounds(table, results, legs=legs)
+    truth = true_positions(table, results, legs)
+    assert (bounds["Best"] <= truth["Best"]).all()
+    assert (bounds["Worst"] >= truth["Worst"]).all()
@@ -0,0 +1,12 @@
+"""Season simulation edge cases."""
+import pandas as pd
+
+from schema import RESULTS_SCHEMA, coerce_results
+from simulate import cached_outlook, position_counts
+
+
+def test_league_without_teams():
+    results, _ = coerce_results(pd.DataFrame(columns=list(RESULTS_SCHEMA)))
+    counts = position_counts(results, seasons=100)
+    assert counts.shape == (0, 0)
+    assert cached_outlook(results, seasons=100).empty
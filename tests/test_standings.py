@@ -0,0 +1,63 @@
+"""StandingsEngine must always agree with a full recompute."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from fixtures import schedule
+from standings import AWAY, AWAY_GOALS, HOME, HOME_GOALS, StandingsEngine, compute_standings, remaining_fixtures
+
+TEAMS = [f"Team {letter}" for letter in "ABCDEFGH"]
+
+
+def random_rows(rng, count, start):
+    home = rng.integers(0, len(TEAMS), count)
+    away = (home + rng.integers(1, len(TEAMS), count)) % len(TEAMS)
+    scored = rng.random(count) < 0.8
+    return pd.DataFrame(
+        {
+            HOME: np.array(TEAMS)[home],
+            AWAY: np.array(TEAMS)[away],
+            HOME_GOALS: np.where(scored, rng.integers(0, 6, count), np.nan),
+            AWAY_GOALS: np.where(scored, rng.integers(0, 6, count), np.nan),
+        },
+        index=pd.RangeIndex(start, start + count),
+    )
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_incremental_updates_match_full_recompute(seed):
+    rng = np.random.default_rng(seed)
+    engine = StandingsEngine()
+    results = random_rows(rng, 10, 0)
+    for _ in range(30):
+        step = rng.integers(0, 3)
+        if step == 0:
+            results = pd.concat([results, random_rows(rng, int(rng.integers(1, 4)), results.index.max() + 1)])
+        elif step == 1 and len(results):
+            edited = rng.choice(results.index, int(rng.integers(1, 3)))
+            replacement = random_rows(rng, len(edited), 0)
+            results.loc[edited] = replacement.to_numpy()
+        elif len(results) > 1:
+            results = results.drop(index=rng.choice(results.index, 1))
+        pd.testing.assert_frame_equal(engine.update(results), compute_standings(results))
+
+
+def test_edit_then_revert():
+    results = random_rows(np.random.default_rng(0), 12, 0)
+    engine = StandingsEngine()
+    engine.update(results)
+    edited = results.copy()
+    edited.loc[3, [HOME_GOALS, AWAY_GOALS]] = [9, 0]
+    pd.testing.assert_frame_equal(engine.update(edited), compute_standings(edited))
+    pd.testing.assert_frame_equal(engine.update(results), compute_standings(results))
+    assert engine.incremental_updates >= 2
+
+
+@pytest.mark.parametrize("legs", [1, 2])
+def test_remaining_fixtures_follow_the_legs(legs):
+    results, _ = schedule(TEAMS[:6], "2026-08-01", double=legs == 2)
+    assert len(remaining_fixtures(results, legs)) == len(results)
+    results[HOME_GOALS] = results[AWAY_GOALS] = 1
+    assert remaining_fixtures(results, legs).empty
+    assert len(remaining_fixtures(results.iloc[:0], legs)) == 0
+    assert len(remaining_fixtures(results.iloc[:3], legs)) == 15 * legs - 3
@@ -0,0 +1,104 @@
+"""Tiebreaker rule chains.
+
+A chain is a list of rule names applied in order. Plain rules read a column
+of the table; ``head_to_head_*`` rules read a mini-table built only from
+matches between teams still level on every earlier rule. All tie groups are
+resolved together: group ids come from one ``groupby().ngroup()`` per rule,
+and the mini-tables for every group are built from a single masked
+aggregation over the results, reused by consecutive head-to-head rules.
+"""
+import numpy as np
+import pandas as pd
+
+from standings import AWAY, HOME, POINTS_FOR_DRAW, POINTS_FOR_WIN, TABLE_COLUMNS, aggregate
+
+TABLE_RULES = {
+    "points": "Pts",
+    "goal_difference": "GD",
+    "goals_for": "GF",
+    "wins": "W",
+}
+
+HEAD_TO_HEAD_RULES = {
+    "head_to_head_points": "Pts",
+    "head_to_head_goal_difference": "GD",
+    "head_to_head_goals_for": "GF",
+}
+
+RULE_CHAINS = {
+    "default": [
+        "points",
+        "goal_difference",
+        "goals_for",
+        "head_to_head_points",
+        "head_to_head_goal_difference",
+        "head_to_head_goals_for",
+    ],
+    "head_to_head_first": [
+        "points",
+        "head_to_head_points",
+        "head_to_head_goal_difference",
+        "head_to_head_goals_for",
+        "goal_difference",
+        "goals_for",
+    ],
+}
+
+
+def resolve_chain(rules):
+    chain = RULE_CHAINS[rules] if isinstance(rules, str) else list(rules)
+    unknown = [rule for rule in chain if rule not in TABLE_RULES and rule not in HEAD_TO_HEAD_RULES]
+    if unknown:
+        raise ValueError(f"Unknown tiebreaker rule(s): {', '.join(unknown)}")
+    return chain
+
+
+def head_to_head(team_names, groups, results, win=POINTS_FOR_WIN, draw=POINTS_FOR_DRAW):
+    """Mini-table stats for every team, counting only matches inside its tie group.
+
+    ``groups`` holds a tie-group id per team; teams alone in their group get
+    zeros. Returns a frame indexed like ``team_names`` with Pts, GD and GF.
+    """
+    group_of = pd.Series(np.asarray(groups), index=team_names)
+    sizes = group_of.map(group_of.value_counts())
+    group_of = group_of.where(sizes > 1)
+
+    home_group = group_of.reindex(results[HOME]).to_numpy()
+    away_group = group_of.reindex(results[AWAY]).to_numpy()
+    inside = home_group == away_group
+
+    mini = aggregate(results[inside]).reindex(team_names, fill_value=0)
+    return pd.DataFrame({
+        "Pts": mini["W"] * win + mini["D"] * draw,
+        "GD": mini["GF"] - mini["GA"],
+        "GF": mini["GF"],
+    })
+
+
+def rank(table, results, rules="default", win=POINTS_FOR_WIN, draw=POINTS_FOR_DRAW):
+    """Order ``table`` by the rule chain, falling back to team name.
+
+    ``table`` is a standings frame as produced by ``standings.finish``.
+    """
+    chain = resolve_chain(rules)
+    table = table.reset_index(drop=True)
+    team_names = pd.Index(table["Team"])
+    keys = np.empty((len(chain), len(table)), dtype="int64")
+    groups = np.zeros(len(table), dtype="int64")
+    mini = None
+
+    for depth, rule in enumerate(chain):
+        if rule in TABLE_RULES:
+            mini = None
+            keys[depth] = table[TABLE_RULES[rule]].to_numpy()
+        else:
+            if mini is None:
+                mini = head_to_head(team_names, groups, results, win, draw)
+            keys[depth] = mini[HEAD_TO_HEAD_RULES[rule]].to_numpy()
+        groups = pd.DataFrame(keys[: depth + 1].T).groupby(list(range(depth + 1))).ngroup().to_numpy()
+
+    name_order = team_names.argsort().argsort()
+    order = np.lexsort(np.vstack([name_order, -keys[::-1]]))
+    ranked = table.iloc[order][TABLE_COLUMNS].reset_index(drop=True)
+    ranked.insert(0, "Pos", range(1, len(ranked) + 1))
+    return ranked
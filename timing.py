@@ -0,0 +1,119 @@
+"""Per-stage timings and opt-in profiling.
+
+Slow pages are broken down by wrapping each stage of the pipeline
+(credentials, spreadsheet open, fetch, parse, standings, write-back,
+render) in ``stage(name)``. Every timed block is logged as one JSON line on
+the ``league.timing`` logger and added to process-wide per-stage totals.
+Stages timed on the script thread during ``rerun()`` are also collected for
+that rerun, so the admin panel can show where the current page spent its
+time next to the background work (pollers, sync) seen by the whole process.
+
+``Profiler`` wraps one rerun in cProfile, or in pyinstrument when it is
+installed and asked for, and returns a text report.
+"""
+import contextvars
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import config
+
+log = logging.getLogger("league.timing")
+
+_rerun = contextvars.ContextVar("rerun_timings", default=None)
+_totals = {}
+_lock = threading.Lock()
+
+
+def record(name, seconds, **fields):
+    """Add one timed run of stage ``name``."""
+    with _lock:
+        count, total, longest = _totals.get(name, (0, 0.0, 0.0))
+        _totals[name] = (count + 1, total + seconds, max(longest, seconds))
+    timings = _rerun.get()
+    if timings is not None:
+        timings.append((name, seconds))
+    if log.isEnabledFor(logging.INFO):
+        log.info(json.dumps(
+            {"event": "stage", "stage": name, "ms": round(seconds * 1000, 3), "thread": threading.current_thread().name,
+             **fields},
+            default=str,
+        ))
+
+
+@contextmanager
+def stage(name, **fields):
+    """Time the enclosed block as stage ``name``; ``fields`` are added to its log line."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start, **fields)
+
+
+@contextmanager
+def rerun():
+    """Collect the stages timed on this thread; yields the list of ``(stage, seconds)``."""
+    timings = []
+    token = _rerun.set(timings)
+    start = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        _rerun.reset(token)
+        record("rerun", time.perf_counter() - start)
+
+
+def totals():
+    """``{stage: {"count", "total_ms", "mean_ms", "max_ms"}}`` since the process started."""
+    with _lock:
+        items = sorted(_totals.items())
+    return {
+        name: {
+            "count": count,
+            "total_ms": round(total * 1000, 3),
+            "mean_ms": round(total / count * 1000, 3),
+            "max_ms": round(longest * 1000, 3),
+        }
+        for name, (count, total, longest) in items
+    }
+
+
+class Profiler:
+    """Opt-in profile of one rerun: ``start()``, run the page, then ``stop()`` for a report."""
+
+    def __init__(self, engine=config.PROFILER, limit=40):
+        self.engine = engine
+        self.limit = limit
+        self._profiler = None
+
+    def start(self):
+        if self.engine == "pyinstrument":
+            try:
+                from pyinstrument import Profiler as Instrument
+            except ImportError:
+                log.warning("pyinstrument is not installed; profiling with cProfile")
+                self.engine = "cprofile"
+            else:
+                self._profiler = Instrument()
+                self._profiler.start()
+                return self
+        import cProfile
+
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+        return self
+
+    def stop(self):
+        if self.engine == "pyinstrument":
+            self._profiler.stop()
+            return self._profiler.output_text(unicode=True, color=False)
+        import io
+        import pstats
+
+        self._profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(self.limit)
+        return out.getvalue()
@@ -0,0 +1,252 @@
+"""Diff-based write-back of DataFrames to worksheets.
+
+Instead of rewriting the whole sheet with ``set_with_dataframe``, the new
+frame is compared with the last state we know the sheet to be in and only
+the changed cells are sent, as runs of adjacent changed cells within a row,
+all in one ``values_batch_update`` request.
+Frames follow the ``get_as_dataframe`` layout: a header in row 1 and an
+integer index where label ``i`` is sheet row ``i + 2``.
+"""
+import logging
+import math
+import threading
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+import scheduler
+from sheet_cache import cache
+from sheet_ranges import column_letter, header
+from timing import stage
+
+log = logging.getLogger(__name__)
+
+HEADER_ROWS = 1
+
+
+def _cell(value):
+    if value is None or value is pd.NA or value is pd.NaT:
+        return ""
+    if isinstance(value, (np.integer, np.bool_)):
+        value = value.item()
+    if isinstance(value, (float, np.floating)):
+        value = float(value)
+        if math.isnan(value):
+            return ""
+        return int(value) if value.is_integer() else value
+    if isinstance(value, datetime):
+        return value.date().isoformat() if value == datetime.combine(value.date(), datetime.min.time(), value.tzinfo) else value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _grid(frame, labels, columns):
+    frame = frame.reindex(index=labels, columns=columns)
+    cells = np.empty((len(labels), len(columns)), dtype=object)
+    for position in range(len(columns)):
+        cells[:, position] = [_cell(value) for value in frame.iloc[:, position]]
+    return cells
+
+
+def rowcol_to_a1(row, column):
+    return f"{column_letter(column)}{row}"
+
+
+def _runs(positions):
+    """Split sorted integers into runs of consecutive values."""
+    runs = []
+    for position in positions:
+        if runs and position == runs[-1][-1] + 1:
+            runs[-1].append(position)
+        else:
+            runs.append([position])
+    return runs
+
+
+def changed_ranges(title, before, after, header=None):
+    """Value ranges covering every cell that differs between two frames, and no other.
+
+    ``header`` is the sheet's header row and maps frame columns to sheet
+    columns; without it frame columns are assumed to be the sheet's columns
+    in order (and a changed header is rewritten). Each range is one row wide
+    and spans only adjacent changed sheet columns, so cells nobody edited
+    are never overwritten. Rows present only in ``before`` are blanked.
+    """
+    columns = list(after.columns)
+    data = []
+    if header is None:
+        header = columns
+        if list(before.columns) != columns:
+            data.append({"range": f"'{title}'!{rowcol_to_a1(1, 1)}", "values": [columns]})
+            before = before.iloc[:0]
+    missing = [column for column in columns if column not in header]
+    if missing:
+        raise ValueError(f"Column(s) not in the {title!r} header: {', '.join(map(str, missing))}")
+    sheet_columns = [list(header).index(column) + 1 for column in columns]
+
+    labels = before.index.union(after.index)
+    if len(labels) == 0:
+        return data
+    old = _grid(before, labels, columns)
+    new = _grid(after, labels, columns)
+    diff = old != new
+
+    for position in np.flatnonzero(diff.any(axis=1)):
+        row = int(labels[position]) + HEADER_ROWS + 1
+        changed = sorted((sheet_columns[column], column) for column in np.flatnonzero(diff[position]))
+        by_sheet_column = dict(changed)
+        for column_run in _runs([sheet_column for sheet_column, _ in changed]):
+            positions = [by_sheet_column[sheet_column] for sheet_column in column_run]
+            data.append({
+                "range": f"'{title}'!{rowcol_to_a1(row, column_run[0])}:{rowcol_to_a1(row, column_run[-1])}",
+                "values": [new[position, positions].tolist()],
+            })
+    return data
+
+
+def changed_cells(before, after, columns=None):
+    """``{(label, column): value}`` for every cell that differs between two frames.
+
+    Values are in the form they are sent to the sheet; rows present only in
+    ``before`` come back blank.
+    """
+    columns = list(after.columns) if columns is None else list(columns)
+    labels = before.index.union(after.index)
+    if len(labels) == 0:
+        return {}
+    new = _grid(after, labels, columns)
+    rows, positions = np.nonzero(_grid(before, labels, columns) != new)
+    return {(int(labels[row]), columns[position]): new[row, position] for row, position in zip(rows, positions)}
+
+
+def write_changes(worksheet, before, after):
+    """Send the cells that differ between ``before`` and ``after``; returns the range count."""
+    data = changed_ranges(worksheet.title, before, after, header(worksheet) or None)
+    if not data:
+        return 0
+    with stage("write", worksheet=worksheet.title, ranges=len(data)):
+        needed_rows = int(after.index.max()) + HEADER_ROWS + 1 if len(after) else 0
+        if needed_rows > worksheet.row_count:
+            scheduler.write(worksheet.add_rows, needed_rows - worksheet.row_count)
+        scheduler.write(worksheet.spreadsheet.values_batch_update, {"valueInputOption": "USER_ENTERED", "data": data})
+    cache.invalidate(worksheet.spreadsheet.id, worksheet.title)
+    return len(data)
+
+
+class BatchWriter:
+    """Coalesces edits to one worksheet made within ``window`` seconds.
+
+    ``submit`` records the latest desired frame and ``submit_changes``
+    applies cell edits on top of what is already queued; the diff against the
+    last known sheet state is sent once the window closes, so several quick
+    edits become one request. With ``window=0`` each submit is written immediately.
+    A write that fails keeps the edit queued for the next submit or flush
+    and leaves the error in ``last_error``.
+    """
+
+    def __init__(self, worksheet, baseline, window=0.0):
+        self.worksheet = worksheet
+        self.window = window
+        self._baseline = baseline
+        self._pending = None
+        self._timer = None
+        self._lock = threading.Lock()
+        self.requests_sent = 0
+        self.failures = 0
+        self.last_error = None
+
+    def observe(self, frame):
+        """Adopt a freshly read sheet state as the baseline when nothing is queued."""
+        with self._lock:
+            if self._pending is None:
+                self._baseline = frame
+
+    def submit(self, frame):
+        with self._lock:
+            self._submit_locked(frame)
+
+    def submit_changes(self, changes):
+        """Queue ``{(label, column): value}`` cell edits on top of the queued or baseline frame."""
+        with self._lock:
+            frame = (self._baseline if self._pending is None else self._pending).copy()
+            for (label, column), value in changes.items():
+                frame.loc[label, column] = value
+            self._submit_locked(frame.sort_index())
+
+    def _submit_locked(self, frame):
+        self._pending = frame
+        if self.window <= 0:
+            self._flush_locked()
+        elif self._timer is None:
+            self._timer = threading.Timer(self.window, self._flush_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        except Exception:
+            log.exception("Writing queued edits to %s failed; they stay queued", self.worksheet.title)
+
+    @property
+    def pending(self):
+        return self._pending is not None
+
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending is None:
+            return
+        pending, self._pending = self._pending, None
+        try:
+            sent = write_changes(self.worksheet, self._baseline, pending)
+        except Exception as error:
+            self._pending = pending
+            self.failures += 1
+            self.last_error = error
+            raise
+        self.last_error = None
+        if sent:
+            self.requests_sent += 1
+        self._baseline = pending
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def forget(spreadsheet_id):
+    with _writers_lock:
+        for key in [key for key in _writers if key[0] == spreadsheet_id]:
+            try:
+                _writers[key].flush()
+            except Exception:
+                # Keep the writer, and with it the queued edits, for the next flush.
+                log.exception("Could not flush queued edits to %s", key[1])
+            else:
+                del _writers[key]
+
+
+def failed_write(spreadsheet_id, title):
+    """The error that is holding back queued edits to a worksheet, if any."""
+    with _writers_lock:
+        writer = _writers.get((spreadsheet_id, title))
+    if writer is None or not writer.pending:
+        return None
+    return writer.last_error
+
+
+def get_writer(worksheet, baseline, window=0.0):
+    key = (worksheet.spreadsheet.id, worksheet.title)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = BatchWriter(worksheet, baseline, window)
+    return writer